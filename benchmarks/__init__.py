@@ -0,0 +1 @@
+"""Offline benchmarks against local stand-in services, see benchmarks/run.py"""
@@ -0,0 +1,146 @@
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, NamedTuple, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from src.transport import Transport
+
+
+class Faults(NamedTuple):
+    """Behaviour of a fake service"""
+    latency_ms: float = 20.0  # mean response time
+    jitter_ms: float = 10.0  # latency is drawn uniformly from mean +- jitter
+    error_rate: float = 0.0  # share of calls answered with a 500
+    throttle_rate: float = 0.0  # share of calls answered with a 429
+    rate_limit: Optional[float] = None  # calls per second above which every call gets a 429
+    retry_after: float = 0.2  # Retry-After of injected 429s in seconds
+
+
+class FaultServer:
+    """
+    Local HTTP server standing in for a music service.
+
+    It carries no data, the fake clients build their responses in process.
+    Every fake API call makes one request here, which is answered after the
+    configured latency with a 200, an injected 500 or a 429. The calls
+    therefore go through the real Transport: pooling, rate limiting, retries
+    and Retry-After handling are all part of what is measured.
+    """
+
+    def __init__(self, faults: Faults, seed: int = 0):
+        self.faults = faults
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_calls = 0
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                status, delay = server._decide()
+                time.sleep(delay)
+                # ?bytes=N asks for a body of N bytes, e.g. a downloaded file
+                query = parse_qs(urlsplit(self.path).query)
+                body = b"\0" * int(query.get("bytes", ["0"])[0]) if status == 200 else b""
+                self.send_response(status)
+                if status == 429:
+                    self.send_header("Retry-After", str(server.faults.retry_after))
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def _decide(self):
+        faults = self.faults
+        with self._lock:
+            self.requests += 1
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start = now
+                self._window_calls = 0
+            self._window_calls += 1
+            over_limit = faults.rate_limit is not None and self._window_calls > faults.rate_limit
+            roll = self._random.random()
+            delay = max(0.0, faults.latency_ms + self._random.uniform(-faults.jitter_ms, faults.jitter_ms)) / 1000
+        if over_limit or roll < faults.throttle_rate:
+            return 429, 0.0
+        if roll < faults.throttle_rate + faults.error_rate:
+            return 500, delay
+        return 200, delay
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class ServiceError(Exception):
+    """A fake call that still failed after the transport's retries"""
+
+    def __init__(self, operation: str, status: int):
+        super().__init__(f"{operation} failed with HTTP {status}")
+        self.status = status
+
+
+class Backend:
+    """
+    Client end of a FaultServer: sends each fake API call through a
+    Transport and records how long it took, labeled by operation.
+    """
+
+    def __init__(self, server: FaultServer, transport: Transport):
+        self.server = server
+        self.transport = transport
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.bytes_received = 0
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self.transport.session()
+            self._local.session = session
+        return session
+
+    def call(self, operation: str, size: int = 0) -> bytes:
+        """
+        Perform one API call.
+
+        Args:
+            operation: Name the call is recorded under
+            size: Size of the response body in bytes
+
+        Returns:
+            Response body
+
+        Raises:
+            ServiceError: The call failed after the transport's retries
+        """
+        start = time.perf_counter()
+        response = self._session().get(f"{self.server.url}/{operation}", params={"bytes": size} if size else None)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.latencies.setdefault(operation, []).append(elapsed)
+            self.bytes_received += len(response.content)
+            if response.status_code != 200:
+                self.errors[operation] = self.errors.get(operation, 0) + 1
+        if response.status_code != 200:
+            raise ServiceError(operation, response.status_code)
+        return response.content
@@ -0,0 +1,287 @@
+import json
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from yandex_music import Client, Playlist, TracksList
+from yandex_music import Track as YaTrack
+
+from src.yamusic import YaMusicHandle
+from src.ytmusic import YTMusicClient
+
+from .backend import Backend, ServiceError
+from .library import LibraryTrack, SyntheticLibrary
+
+# Tracks per get_playlist page, as served by YouTube Music
+PAGE_SIZE = 100
+
+
+class FakeYandexClient(Client):
+    """
+    yandex_music Client serving a SyntheticLibrary.
+
+    Responses are built as the JSON the API would return and parsed with
+    de_json, so model parsing costs what it costs with the real client.
+    Every call makes one request to the fault server.
+    """
+
+    def __init__(self, library: SyntheticLibrary, backend: Backend):
+        super().__init__()
+        self.library = library
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.likes_revision = 1
+        # kind -> {"title", "revision", "tracks": [LibraryTrack]}
+        self.playlists: Dict[int, Dict[str, Any]] = {
+            1000 + i: {"title": name, "revision": 1, "tracks": list(library.playlist_tracks[name])}
+            for i, name in enumerate(library.playlist_names)
+        }
+
+    @property
+    def kinds(self) -> Dict[str, int]:
+        return {playlist["title"]: kind for kind, playlist in self.playlists.items()}
+
+    @staticmethod
+    def _track_data(track: LibraryTrack) -> Dict[str, Any]:
+        return {
+            "id": track.id,
+            "title": track.title,
+            "durationMs": track.duration * 1000,
+            "available": True,
+            "artists": [{"id": int(track.artist.split()[1]) + 1, "name": track.artist}],
+            "albums": [{"id": int(track.album_id)}],
+        }
+
+    @staticmethod
+    def _track_short_data(track: LibraryTrack) -> Dict[str, Any]:
+        return {"id": track.id, "albumId": track.album_id, "timestamp": "2024-01-01T00:00:00+00:00"}
+
+    def _playlist_data(self, kind: int, with_tracks: bool = False) -> Dict[str, Any]:
+        playlist = self.playlists[kind]
+        data = {
+            "owner": {"uid": 1, "login": "bench"},
+            "uid": 1,
+            "kind": kind,
+            "title": playlist["title"],
+            "revision": playlist["revision"],
+            "trackCount": len(playlist["tracks"]),
+            "cover": {"type": "mosaic", "custom": False},
+        }
+        if with_tracks:
+            data["tracks"] = [
+                {**self._track_short_data(track), "track": self._track_data(track)}
+                for track in playlist["tracks"]
+            ]
+        return data
+
+    def users_likes_tracks(self, user_id=None, if_modified_since_revision: int = 0, *args, **kwargs) -> Optional[TracksList]:
+        self.backend.call("users_likes_tracks")
+        if if_modified_since_revision and if_modified_since_revision >= self.likes_revision:
+            return None
+        data = {
+            "uid": 1,
+            "revision": self.likes_revision,
+            "tracks": [self._track_short_data(track) for track in self.library.tracks],
+        }
+        return TracksList.de_json(data, self)
+
+    def tracks(self, track_ids, with_positions: bool = True, *args, **kwargs) -> List[YaTrack]:
+        self.backend.call("tracks")
+        if not isinstance(track_ids, list):
+            track_ids = [track_ids]
+        data = []
+        for track_id in track_ids:
+            track = self.library.by_id.get(str(track_id).split(":")[0])
+            if track is not None:
+                data.append(self._track_data(track))
+        return YaTrack.de_list(data, self)
+
+    def users_playlists_list(self, user_id=None, *args, **kwargs) -> List[Playlist]:
+        self.backend.call("users_playlists_list")
+        with self._lock:
+            data = [self._playlist_data(kind) for kind in self.playlists]
+        return Playlist.de_list(data, self)
+
+    def users_playlists(self, kind, user_id=None, *args, **kwargs) -> Playlist:
+        self.backend.call("users_playlists")
+        with self._lock:
+            data = self._playlist_data(int(kind), with_tracks=True)
+        return Playlist.de_json(data, self)
+
+    def users_playlists_change(self, kind, diff: str, revision: int = 1, user_id=None, *args, **kwargs) -> Playlist:
+        self.backend.call("users_playlists_change")
+        with self._lock:
+            playlist = self.playlists[int(kind)]
+            if revision != playlist["revision"]:
+                raise ServiceError("users_playlists_change", 412)
+            tracks = playlist["tracks"]
+            for operation in json.loads(diff):
+                if operation["op"] == "delete":
+                    del tracks[operation["from"]:operation["to"]]
+                else:
+                    added = [self.library.by_id[track["id"]] for track in operation["tracks"]]
+                    tracks[operation["at"]:operation["at"]] = added
+            playlist["revision"] += 1
+            data = self._playlist_data(int(kind))
+        return Playlist.de_json(data, self)
+
+    def users_playlists_create(self, title: str, visibility: str = "public", user_id=None, *args, **kwargs) -> Playlist:
+        self.backend.call("users_playlists_create")
+        with self._lock:
+            kind = max(self.playlists, default=999) + 1
+            self.playlists[kind] = {"title": title, "revision": 1, "tracks": []}
+            data = self._playlist_data(kind)
+        return Playlist.de_json(data, self)
+
+
+class BenchYaMusicHandle(YaMusicHandle):
+    """YaMusicHandle whose API client is a FakeYandexClient"""
+
+    def __init__(self, library: SyntheticLibrary, backend: Backend, **kwargs):
+        self.library = library
+        self.backend = backend
+        super().__init__("bench", transport=backend.transport, **kwargs)
+
+    def _init_client(self) -> Client:
+        client = FakeYandexClient(self.library, self.backend)
+        if self.metrics is not None:
+            self.metrics.instrument(client, "yamusic")
+        return client
+
+
+class YTLibraryState:
+    """Library of the fake YouTube Music account, shared by every FakeYTMusic instance"""
+
+    def __init__(self, library: SyntheticLibrary):
+        self.library = library
+        self.lock = threading.Lock()
+        self.liked: Dict[str, None] = dict.fromkeys(track.video_id for track in library.tracks)
+        # playlistId -> {"title", "videoIds": {videoId: None}}
+        self.playlists: Dict[str, Dict[str, Any]] = {
+            f"PLbench{i:05d}": {
+                "title": name,
+                "videoIds": dict.fromkeys(track.video_id for track in library.playlist_tracks[name]),
+            }
+            for i, name in enumerate(library.playlist_names)
+        }
+
+    @property
+    def ids(self) -> Dict[str, str]:
+        return {playlist["title"]: playlist_id for playlist_id, playlist in self.playlists.items()}
+
+
+class FakeYTMusic:
+    """
+    Stand-in for ytmusicapi.YTMusic serving a YTLibraryState.
+
+    Listings are paginated like the real API, one fault server request per page.
+    """
+
+    def __init__(self, state: YTLibraryState, backend: Backend):
+        self.state = state
+        self.library = state.library
+        self.backend = backend
+
+    @staticmethod
+    def _song(track: LibraryTrack) -> Dict[str, Any]:
+        return {
+            "videoId": track.video_id,
+            "title": track.title,
+            "artists": [{"name": track.artist, "id": f"UC{track.artist.split()[1]}"}],
+            "duration_seconds": track.duration,
+        }
+
+    def search(self, query: str, filter: Optional[str] = None, limit: int = 20, **kwargs) -> List[Dict[str, Any]]:
+        self.backend.call("search")
+        track = self.library.by_query.get(query)
+        if track is None:
+            return []
+        # A karaoke version that doesn't reach the match threshold on its own
+        decoy = {
+            "videoId": f"k{track.video_id[1:]}",
+            "title": f"{track.title} (Karaoke Version)",
+            "artists": [{"name": "Karaoke Stars", "id": "UCkaraoke"}],
+            "duration_seconds": track.duration + 90,
+        }
+        results = [self._song(track), decoy] if self.library.is_found(track) else [decoy]
+        return results[:limit]
+
+    def rate_song(self, videoId: str, rating: str = "INDIFFERENT") -> Dict[str, Any]:
+        self.backend.call("rate_song")
+        with self.state.lock:
+            if rating == "LIKE":
+                self.state.liked[videoId] = None
+            else:
+                self.state.liked.pop(videoId, None)
+        return {}
+
+    def get_library_playlists(self, limit: Optional[int] = 25) -> List[Dict[str, Any]]:
+        with self.state.lock:
+            playlists = [{"playlistId": "LM", "title": "Liked Music"}] + [
+                {"playlistId": playlist_id, "title": playlist["title"], "count": len(playlist["videoIds"])}
+                for playlist_id, playlist in self.state.playlists.items()
+            ]
+        if limit is not None:
+            playlists = playlists[:limit]
+        for _ in range(max(1, math.ceil(len(playlists) / 25))):
+            self.backend.call("get_library_playlists")
+        return playlists
+
+    def get_playlist(self, playlistId: str, limit: Optional[int] = 100, **kwargs) -> Dict[str, Any]:
+        with self.state.lock:
+            if playlistId == "LM":
+                title, video_ids = "Liked Music", list(self.state.liked)
+            else:
+                playlist = self.state.playlists[playlistId]
+                title, video_ids = playlist["title"], list(playlist["videoIds"])
+        if limit is not None:
+            video_ids = video_ids[:limit]
+        for _ in range(max(1, math.ceil(len(video_ids) / PAGE_SIZE))):
+            self.backend.call("get_playlist")
+        return {
+            "id": playlistId,
+            "title": title,
+            "trackCount": len(video_ids),
+            "tracks": [self._song(self.library.by_video_id[video_id]) for video_id in video_ids],
+        }
+
+    def add_playlist_items(self, playlistId: str, videoIds: Optional[List[str]] = None, **kwargs) -> Dict[str, Any]:
+        self.backend.call("add_playlist_items")
+        with self.state.lock:
+            self.state.playlists[playlistId]["videoIds"].update(dict.fromkeys(videoIds or []))
+        return {"status": "STATUS_SUCCEEDED"}
+
+    def create_playlist(self, title: str, description: str = "", privacy_status: str = "PRIVATE",
+                        video_ids: Optional[List[str]] = None, source_playlist: Optional[str] = None) -> str:
+        self.backend.call("create_playlist")
+        with self.state.lock:
+            playlist_id = f"PLbench{len(self.state.playlists):05d}"
+            self.state.playlists[playlist_id] = {"title": title, "videoIds": dict.fromkeys(video_ids or [])}
+        return playlist_id
+
+
+class BenchYTMusicClient(YTMusicClient):
+    """YTMusicClient on FakeYTMusic instances, downloading from the fault server instead of yt-dlp"""
+
+    def __init__(self, library: SyntheticLibrary, backend: Backend, download_bytes: int = 4096, **kwargs):
+        self.state = YTLibraryState(library)
+        self.backend = backend
+        self.download_bytes = download_bytes
+        super().__init__(transport=backend.transport, **kwargs)
+
+    def _build_ytmusic(self) -> FakeYTMusic:  # type: ignore[override]
+        return FakeYTMusic(self.state, self.backend)
+
+    def download_track(self, video_id: str, output_path: str = "downloads", format_type: str = "mp3",
+                       quality: str = "best", progress_hooks=None, quiet: bool = True) -> Optional[str]:
+        Path(output_path).mkdir(parents=True, exist_ok=True)
+        try:
+            data = self.backend.call("download", self.download_bytes)
+        except ServiceError:
+            return None
+        filename = os.path.join(output_path, f"{video_id}.{format_type}")
+        with open(filename, "wb") as f:
+            f.write(data)
+        return filename
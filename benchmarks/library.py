@@ -0,0 +1,86 @@
+import random
+from typing import Any, Dict, List, NamedTuple
+
+from src.track import Track
+
+
+class LibraryTrack(NamedTuple):
+    id: str  # Yandex.Music track id
+    album_id: str
+    video_id: str  # YouTube Music videoId
+    artist: str
+    title: str
+    duration: int  # seconds
+
+
+class SyntheticLibrary:
+    """
+    Deterministic music library of the same user on both services.
+
+    Every track is liked on both services. Artists have about ten tracks
+    each, and every other artist is mapped to one of the playlists. Mapped
+    playlists initially hold the first half of their artists' tracks, so
+    distributing and syncing always have the other half left to add. Every
+    twentieth track has no YouTube Music match.
+    """
+
+    def __init__(self, size: int, seed: int = 0):
+        rng = random.Random(seed)
+        self.size = size
+        artist_count = max(1, size // 10)
+        self.playlist_names = [f"Playlist {i:03d}" for i in range(max(4, size // 1000))]
+
+        self.tracks: List[LibraryTrack] = []
+        for i in range(size):
+            self.tracks.append(LibraryTrack(
+                id=str(10_000_000 + i),
+                album_id=str(20_000_000 + i // 12),
+                video_id=f"v{i:010d}",
+                artist=f"Artist {rng.randrange(artist_count):05d}",
+                title=f"Song {i:06d}",
+                duration=rng.randint(120, 360),
+            ))
+
+        # Mapped artists and their playlists
+        self.playlist_artists: Dict[str, List[str]] = {name: [] for name in self.playlist_names}
+        for a in range(0, artist_count, 2):
+            name = self.playlist_names[(a // 2) % len(self.playlist_names)]
+            self.playlist_artists[name].append(f"Artist {a:05d}")
+
+        artist_playlist = {
+            artist: name for name, artists in self.playlist_artists.items() for artist in artists
+        }
+        seen: Dict[str, int] = {}
+        self.playlist_tracks: Dict[str, List[LibraryTrack]] = {name: [] for name in self.playlist_names}
+        routed: Dict[str, List[LibraryTrack]] = {}
+        for track in self.tracks:
+            if track.artist in artist_playlist:
+                routed.setdefault(track.artist, []).append(track)
+        for artist, tracks in routed.items():
+            self.playlist_tracks[artist_playlist[artist]].extend(tracks[:(len(tracks) + 1) // 2])
+
+        self.by_id = {track.id: track for track in self.tracks}
+        self.by_video_id = {track.video_id: track for track in self.tracks}
+        self.by_query = {f"{track.artist} {track.title}": track for track in self.tracks}
+
+    def is_found(self, track: LibraryTrack) -> bool:
+        """Whether YouTube Music search finds the track"""
+        return int(track.id) % 20 != 19
+
+    def export_tracks(self) -> List[Track]:
+        """Liked tracks as exported from Yandex.Music"""
+        return [Track(track.artist, track.title, track.id, track.duration) for track in self.tracks]
+
+    def playlists_map(self, ids: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """playlists_map.yaml of the YouTube Music playlists with the given ids"""
+        return {
+            name: {"id": ids[name], "artists": artists}
+            for name, artists in self.playlist_artists.items()
+        }
+
+    def yamusic_config(self, kinds: Dict[str, int]) -> Dict[str, Dict[str, Any]]:
+        """yamusic.yaml of the Yandex.Music playlists with the given kinds"""
+        return {
+            name: {"kind": kinds[name], "artists": artists}
+            for name, artists in self.playlist_artists.items()
+        }
@@ -0,0 +1,326 @@
+"""
+Offline benchmarks of the transfer commands against local stand-in services.
+
+Each (command, library size) runs in its own process inside a temporary
+directory, so peak RSS belongs to that command alone and the files it writes
+don't touch the working tree:
+
+    python -m benchmarks.run --sizes 1000,10000
+    python -m benchmarks.run --latency-ms 50 --error-rate 0.02 --throttle-rate 0.01
+    python -m benchmarks.run --save-baseline
+    python -m benchmarks.run --compare
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE_FILE = Path(__file__).resolve().parent / "baselines.json"
+
+# Settings that have to match for results to be comparable
+SETTINGS = (
+    "latency_ms", "jitter_ms", "error_rate", "throttle_rate", "rate_limit",
+    "workers", "chunk_size", "rate", "retries", "backoff", "download_bytes",
+)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark commands against local fake Yandex.Music and YouTube Music")
+    parser.add_argument("--commands", type=str, default=",".join(COMMANDS),
+                        help=f"Comma separated commands to run (default: all of {', '.join(COMMANDS)})")
+    parser.add_argument("--sizes", type=str, default="1000,10000",
+                        help="Comma separated library sizes in tracks, e.g. 1000,10000,100000")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Mean response time of the fake services")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="Response times vary by up to this much")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of calls answered with a 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of calls answered with a 429")
+    parser.add_argument("--rate-limit", type=float,
+                        help="Calls per second above which the fake services answer with 429 (default: no limit)")
+    parser.add_argument("--workers", type=int, default=4, help="Export, import and download workers")
+    parser.add_argument("--chunk-size", type=int, default=100, help="Yandex.Music tracks resolved per request")
+    parser.add_argument("--rate", type=float, default=0,
+                        help="Client side requests per second of each service (0 disables the limit)")
+    parser.add_argument("--retries", type=int, default=5, help="Retries of a throttled or failed request")
+    parser.add_argument("--backoff", type=float, default=0.05, help="Base delay of the first retry in seconds")
+    parser.add_argument("--download-bytes", type=int, default=4096, help="Size of a downloaded track")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Store the results in {BASELINE_FILE.name}")
+    parser.add_argument("--compare", action="store_true",
+                        help="Compare the results with the baseline and exit with 1 on a regression")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="Relative throughput drop or RSS/p99 growth reported as a regression")
+    parser.add_argument("--baseline-file", type=str, default=str(BASELINE_FILE), help="Baseline file to use")
+    parser.add_argument("--verbose", action="store_true", help="Show the output of the benchmarked commands")
+    parser.add_argument("--child", nargs=3, metavar=("COMMAND", "SIZE", "RESULT"), help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+# ===== Commands, run in the child process =====
+
+def _backend(args: argparse.Namespace, name: str):
+    from src.transport import Transport
+    from .backend import Backend, FaultServer, Faults
+
+    server = FaultServer(Faults(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        rate_limit=args.rate_limit,
+    ))
+    transport = Transport(
+        name,
+        rate=args.rate or None,
+        retries=args.retries,
+        backoff=args.backoff,
+        pool_size=max(10, args.workers),
+    )
+    return Backend(server, transport)
+
+
+def _yamusic(library, args):
+    from .fakes import BenchYaMusicHandle
+
+    return BenchYaMusicHandle(
+        library,
+        _backend(args, "yamusic"),
+        chunk_size=args.chunk_size,
+        max_workers=args.workers,
+        download_workers=args.workers,
+    )
+
+
+def _ytmusic(library, args):
+    from .fakes import BenchYTMusicClient
+
+    return BenchYTMusicClient(library, _backend(args, "ytmusic"), args.download_bytes, workers=args.workers)
+
+
+def bench_export(library, args):
+    handle = _yamusic(library, args)
+    return handle.backend, lambda: handle.export_liked_tracks()
+
+
+def bench_import(library, args):
+    client = _ytmusic(library, args)
+    tracks = library.export_tracks()
+    return client.backend, lambda: client.import_liked_tracks(tracks)
+
+
+def bench_distribute(library, args):
+    client = _ytmusic(library, args)
+    with open("playlists_map.yaml", "w", encoding="utf-8") as f:
+        yaml.dump(library.playlists_map(client.state.ids), f, allow_unicode=True, sort_keys=False)
+    return client.backend, lambda: client.distribute_tracks()
+
+
+def bench_sync(library, args):
+    handle = _yamusic(library, args)
+    with open("yamusic.yaml", "w", encoding="utf-8") as f:
+        yaml.dump(library.yamusic_config(handle.client.kinds), f, allow_unicode=True, sort_keys=False)
+    return handle.backend, lambda: handle.sync_playlists_from_yaml("yamusic.yaml")
+
+
+def bench_download(library, args):
+    client = _ytmusic(library, args)
+    return client.backend, lambda: client.download_all_playlists(
+        base_output_path="downloads", playlist_limit=None, workers=args.workers
+    )
+
+
+# name -> setup returning the backend to measure and the command call
+COMMANDS: Dict[str, Callable] = {
+    "export": bench_export,
+    "import": bench_import,
+    "distribute": bench_distribute,
+    "sync": bench_sync,
+    "download": bench_download,
+}
+
+
+def _items(command: str, library) -> int:
+    """Tracks a command processes: the whole library, or the playlist tracks for downloads"""
+    if command == "download":
+        return sum(len(tracks) for tracks in library.playlist_tracks.values())
+    return library.size
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def run_child(args: argparse.Namespace) -> None:
+    from .library import SyntheticLibrary
+
+    command, size, result_file = args.child
+    library = SyntheticLibrary(int(size))
+    backend, run = COMMANDS[command](library, args)
+    setup_rss = _max_rss_mb()
+
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+
+    latencies = [latency for values in backend.latencies.values() for latency in values]
+    items = _items(command, library)
+    result = {
+        "command": command,
+        "size": int(size),
+        "items": items,
+        "seconds": seconds,
+        "throughput": items / seconds if seconds else 0.0,
+        "calls": len(latencies),
+        "errors": sum(backend.errors.values()),
+        "p50_ms": _percentile(latencies, 0.5) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "setup_rss_mb": setup_rss,
+        "peak_rss_mb": _max_rss_mb(),
+        "bytes_received": backend.bytes_received,
+        "operations": {
+            operation: {
+                "calls": len(values),
+                "errors": backend.errors.get(operation, 0),
+                "p50_ms": _percentile(values, 0.5) * 1000,
+                "p99_ms": _percentile(values, 0.99) * 1000,
+            }
+            for operation, values in sorted(backend.latencies.items())
+        },
+    }
+    backend.server.close()
+    with open(result_file, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+# ===== Driver =====
+
+def run_benchmark(command: str, size: int, argv: List[str], verbose: bool) -> Dict[str, Any]:
+    """Run one benchmark in a fresh process and temporary directory"""
+    with tempfile.TemporaryDirectory(prefix=f"bench-{command}-") as workdir:
+        result_file = os.path.join(workdir, "result.json")
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")]))}
+        output = None if verbose else subprocess.DEVNULL
+        process = subprocess.run(
+            [sys.executable, "-m", "benchmarks.run", *argv, "--child", command, str(size), result_file],
+            cwd=workdir,
+            env=env,
+            stdout=output,
+            stderr=output,
+        )
+        if process.returncode != 0:
+            raise RuntimeError(f"{command} on {size} tracks failed with exit code {process.returncode}")
+        with open(result_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+def print_result(result: Dict[str, Any]) -> None:
+    print(
+        f"  {result['command']:<11} {result['size']:>7} {result['seconds']:9.2f}s "
+        f"{result['throughput']:10.1f}/s {result['p50_ms']:8.1f} {result['p99_ms']:8.1f} "
+        f"{result['peak_rss_mb']:9.1f} {result['calls']:>8} {result['errors']:>6}"
+    )
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Regressions of the results against a baseline.
+
+    Returns:
+        One line per regressed metric, empty if there are none
+    """
+    regressions = []
+    for key, result in results.items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        if result["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{key}: throughput {result['throughput']:.1f}/s, baseline {base['throughput']:.1f}/s"
+            )
+        for metric in ("p99_ms", "peak_rss_mb"):
+            if result[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{key}: {metric} {result[metric]:.1f}, baseline {base[metric]:.1f}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    args = parse_args(argv)
+    if args.child:
+        run_child(args)
+        return
+
+    commands = [name.strip() for name in args.commands.split(",") if name.strip()]
+    unknown = [name for name in commands if name not in COMMANDS]
+    if unknown:
+        sys.exit(f"Unknown commands: {', '.join(unknown)}. Available: {', '.join(COMMANDS)}")
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    settings = {name: getattr(args, name) for name in SETTINGS}
+    # Options handed to the child processes
+    child_argv = [arg for arg in argv if arg not in ("--save-baseline", "--compare", "--verbose")]
+
+    print(f"Fake services: {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms, "
+          f"{args.error_rate:.1%} errors, {args.throttle_rate:.1%} throttled")
+    print(f"  {'command':<11} {'tracks':>7} {'time':>10} {'throughput':>12} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'peak MB':>9} {'calls':>8} {'errors':>6}")
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for command in commands:
+        for size in sizes:
+            result = run_benchmark(command, size, child_argv, args.verbose)
+            results[f"{command}@{size}"] = result
+            print_result(result)
+
+    baseline_file = Path(args.baseline_file)
+    exit_code = 0
+    if args.compare:
+        if not baseline_file.exists():
+            sys.exit(f"No baseline in {baseline_file}, create one with --save-baseline")
+        with open(baseline_file, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("settings") != settings:
+            print(f"Warning: baseline was recorded with different settings: {baseline.get('settings')}")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regressions against {baseline_file}:")
+            for line in regressions:
+                print(f"  {line}")
+            exit_code = 1
+        else:
+            print(f"\nNo regressions against {baseline_file} (tolerance {args.tolerance:.0%})")
+
+    if args.save_baseline:
+        baseline = {"settings": settings, "results": {}}
+        if baseline_file.exists():
+            with open(baseline_file, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            # Keep results of other commands and sizes recorded with the same settings
+            if stored.get("settings") == settings:
+                baseline = stored
+        baseline["results"].update(results)
+        with open(baseline_file, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {baseline_file}")
+
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
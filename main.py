@@ -4,17 +4,28 @@ Yandex.Music to YouTube Music Transfer Tool
 Main entry point
 """
 
+import time
+
+# Measured from here, the startup benchmark reports time to the first prompt
+_START = time.perf_counter()
+
+import sys
 from src import (
+    Clients,
     load_config,
     parse_args,
     setup_logging,
     get_logger,
-    YaMusicHandle,
-    YTMusicClient,
-    CLI
+    CLI,
+    Pipeline,
+    load_steps,
+    MetricsExporter,
 )
 from pathlib import Path
 
+# Modules only loaded once a command needs them
+HEAVY_MODULES = ("yandex_music", "ytmusicapi", "yt_dlp", "tqdm", "requests")
+
 
 def main() -> None:
     # Create logs directory if it doesn't exist
@@ -28,6 +39,10 @@ def main() -> None:
     # Override output path to use logs folder if not absolute path
     if args.output and not Path(args.output).is_absolute():
         args.output = str(logs_dir / args.output)
+    for name in ("metrics_file", "metrics_json"):
+        path = getattr(args, name)
+        if path and not Path(path).is_absolute():
+            setattr(args, name, str(logs_dir / path))
     
     setup_logging(args.log_level, args.output)
     logger = get_logger(__name__)
@@ -44,18 +59,51 @@ def main() -> None:
         if not args.no_proxy:
             logger.info(f"Proxy port: {args.proxy_port}")
         
-        # Initialize clients
-        logger.info("Initializing Yandex.Music client...")
-        yamusic = YaMusicHandle(config["token"])
-        
-        logger.info("Initializing YouTube Music client...")
-        ytmusic = YTMusicClient()
-        
-        logger.info("Successfully initialized both clients")
-        
-        # Start CLI interface
-        cli = CLI(yamusic, ytmusic, args)
-        cli.run()
+        # Clients are initialized by the first command that uses them
+        clients = Clients(args, config)
+
+        if args.startup_benchmark:
+            CLI(clients, args)
+            elapsed = time.perf_counter() - _START
+            loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+            print(f"Time to first prompt: {elapsed * 1000:.0f} ms")
+            print(f"Heavy modules loaded: {', '.join(loaded) or 'none'}")
+            return
+
+        # API call metrics are exported periodically and once more when the run ends
+        exporter = None
+        if clients.metrics is not None:
+            exporter = MetricsExporter(
+                clients.metrics, args.metrics_file, args.metrics_json, args.metrics_interval
+            ).start()
+
+        failed = False
+        try:
+            if args.pipeline or args.steps:
+                # Run scripted steps in one process, sharing clients and fetched data
+                if args.pipeline:
+                    steps, continue_on_error = load_steps(args.pipeline)
+                else:
+                    steps = [(name.strip(), {}) for name in args.steps.split(",") if name.strip()]
+                    continue_on_error = False
+                results = Pipeline(clients, args).run(
+                    steps, continue_on_error=continue_on_error or args.continue_on_error
+                )
+                failed = any(result.error is not None for result in results)
+            else:
+                # Start CLI interface
+                cli = CLI(clients, args)
+                cli.run()
+        finally:
+            # Also on errors and Ctrl-C, so metrics, cache and mirror are written out
+            if exporter is not None:
+                exporter.stop()
+                logger.info(f"API metrics written to {args.metrics_file} and {args.metrics_json}")
+            clients.close()
+
+        if failed:
+            logger.error("Pipeline finished with failed steps")
+            exit(1)
         
         logger.info("Transfer completed successfully")
         
@@ -1,16 +1,36 @@
-from src.config import load_config
-from src.args import parse_args
-from src.logger import setup_logging, get_logger
-from src.yamusic import YaMusicHandle
-from src.ytmusic import YTMusicClient
-from src.cli import CLI
+import importlib
 
-__all__ = [
-    'load_config',
-    'parse_args',
-    'setup_logging',
-    'get_logger',
-    'YaMusicHandle',
-    'YTMusicClient',
-    'CLI'
-]
\ No newline at end of file
+# Exports are imported on first access, so `from src import parse_args` doesn't
+# pull in yandex_music, ytmusicapi or yt_dlp
+_EXPORTS = {
+    'load_config': 'src.config',
+    'parse_args': 'src.args',
+    'setup_logging': 'src.logger',
+    'get_logger': 'src.logger',
+    'YaMusicHandle': 'src.yamusic',
+    'YTMusicClient': 'src.ytmusic',
+    'CLI': 'src.cli',
+    'Clients': 'src.clients',
+    'Pipeline': 'src.pipeline',
+    'load_steps': 'src.pipeline',
+    'MatchCache': 'src.cache',
+    'DAY': 'src.cache',
+    'MatchScorer': 'src.matching',
+    'ContentStore': 'src.store',
+    'LibraryMirror': 'src.mirror',
+    'MINUTE': 'src.mirror',
+    'LikesDelta': 'src.likes',
+    'Transport': 'src.transport',
+    'Metrics': 'src.metrics',
+    'MetricsExporter': 'src.metrics',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
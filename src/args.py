@@ -41,4 +41,260 @@ def parse_args() -> argparse.Namespace:
         type=str,
         help="Specific log file name (optional, default: auto-generated with timestamp)"
     )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=100,
+        help="Number of Yandex.Music tracks resolved per request on export"
+    )
+    parser.add_argument(
+        "--export-workers",
+        type=int,
+        default=4,
+        help="Number of concurrent chunk requests on Yandex.Music export"
+    )
+    parser.add_argument(
+        "--import-workers",
+        type=int,
+        default=4,
+        help="Number of concurrent search/like workers on YouTube Music import (1 disables concurrency)"
+    )
+    parser.add_argument(
+        "--cache-file",
+        type=str,
+        default="match_cache.sqlite",
+        help="SQLite file of the Yandex.Music -> YouTube Music match cache"
+    )
+    parser.add_argument(
+        "--cache-ttl-days",
+        type=float,
+        default=30,
+        help="Lifetime of a cached match in days"
+    )
+    parser.add_argument(
+        "--cache-not-found-ttl-days",
+        type=float,
+        default=3,
+        help="Lifetime of a cached \"not found\" result in days"
+    )
+    parser.add_argument(
+        "--cache-max-entries",
+        type=int,
+        default=200000,
+        help="Maximum number of cached matches before least recently used ones are evicted"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the match cache"
+    )
+    parser.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        help="Search every track again and overwrite cached matches"
+    )
+    parser.add_argument(
+        "--journal",
+        type=str,
+        help="Transfer journal file (optional, default: <output>.journal.jsonl)"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume an interrupted transfer from its journal, skipping tracks already done"
+    )
+    parser.add_argument(
+        "--new-likes-only",
+        action="store_true",
+        help="Transfer and check only tracks liked since the last run of the command"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Search and like tracks while the Yandex.Music export is still running, in constant memory"
+    )
+    parser.add_argument(
+        "--stream-queue-size",
+        type=int,
+        default=100,
+        help="Maximum number of exported tracks waiting for a search worker in --stream mode"
+    )
+    parser.add_argument(
+        "--target-playlist",
+        type=str,
+        help="Transfer into this YouTube Music playlist (id or title, created if missing) instead of liking"
+    )
+    parser.add_argument(
+        "--playlist-chunk-size",
+        type=int,
+        default=100,
+        help="Number of tracks added per playlist write in --target-playlist mode"
+    )
+    parser.add_argument(
+        "--match-threshold",
+        type=float,
+        default=0.5,
+        help="Minimum match confidence (0-1) below which a track is reported as not found"
+    )
+    parser.add_argument(
+        "--download-workers",
+        type=int,
+        default=4,
+        help="Maximum number of concurrent track downloads (YouTube Music and Yandex.Music)"
+    )
+    parser.add_argument(
+        "--per-playlist-workers",
+        type=int,
+        help="Maximum number of concurrent downloads per playlist (optional, default: no limit)"
+    )
+    parser.add_argument(
+        "--store",
+        type=str,
+        help="Content-addressed download store shared by all playlists (optional, e.g. downloads/.store)"
+    )
+    parser.add_argument(
+        "--store-link",
+        type=str,
+        default="hardlink",
+        choices=["hardlink", "symlink"],
+        help="How playlist folders reference files in the download store"
+    )
+    parser.add_argument(
+        "--yaml-track-maps",
+        action="store_true",
+        help="Also export per-playlist track_map_<playlist>.yaml files after downloading"
+    )
+    parser.add_argument(
+        "--any-artist",
+        action="store_true",
+        help="Route tracks to playlists by any credited artist, not only the main one"
+    )
+    parser.add_argument(
+        "--full-sync",
+        action="store_true",
+        help="Clear and refill Yandex.Music playlists on sync instead of applying only the difference"
+    )
+    parser.add_argument(
+        "--mirror-file",
+        type=str,
+        default="library_mirror.sqlite",
+        help="SQLite file mirroring both libraries between runs"
+    )
+    parser.add_argument(
+        "--mirror-max-age-minutes",
+        type=float,
+        default=15,
+        help="Minutes a mirrored library listing is used without checking the services for changes"
+    )
+    parser.add_argument(
+        "--no-mirror",
+        action="store_true",
+        help="Always fetch libraries from the services instead of the local mirror"
+    )
+    parser.add_argument(
+        "--refresh-mirror",
+        action="store_true",
+        help="Check every mirrored listing for changes, refetching only changed playlists"
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Serve read-only commands from the library mirror without checking for changes"
+    )
+    parser.add_argument(
+        "--ytmusic-rate",
+        type=float,
+        default=5,
+        help="Maximum YouTube Music API requests per second (0 disables the limit)"
+    )
+    parser.add_argument(
+        "--yamusic-rate",
+        type=float,
+        default=10,
+        help="Maximum Yandex.Music API requests per second (0 disables the limit)"
+    )
+    parser.add_argument(
+        "--http-retries",
+        type=int,
+        default=5,
+        help="Retries of a throttled (429/5xx) or dropped API request, with exponential backoff"
+    )
+    parser.add_argument(
+        "--http-backoff",
+        type=float,
+        default=0.5,
+        help="Base delay in seconds of the first retry, doubled on every further retry"
+    )
+    parser.add_argument(
+        "--connect-timeout",
+        type=float,
+        default=5,
+        help="Seconds to wait for an API connection to be established"
+    )
+    parser.add_argument(
+        "--read-timeout",
+        type=float,
+        default=30,
+        help="Seconds to wait for an API response"
+    )
+    parser.add_argument(
+        "--pipeline",
+        type=str,
+        help="Run the steps listed in this YAML file without the interactive menu"
+    )
+    parser.add_argument(
+        "--steps",
+        type=str,
+        help="Run these comma separated steps without the interactive menu, e.g. yt.playlist_map,yt.distribute,yt.download"
+    )
+    parser.add_argument(
+        "--continue-on-error",
+        action="store_true",
+        help="Keep running the remaining pipeline steps after one fails"
+    )
+    parser.add_argument(
+        "--account-ttl-minutes",
+        type=float,
+        default=10,
+        help="Minutes the Yandex.Music account status is reused from the library mirror instead of requested on startup"
+    )
+    parser.add_argument(
+        "--startup-benchmark",
+        action="store_true",
+        help="Report the time to the first prompt and the heavy modules loaded by then, then exit"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile every command with cProfile and tracemalloc, writing profile_<command>_* files to logs/"
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=20,
+        help="Number of functions and allocation sites listed in a profile summary"
+    )
+    parser.add_argument(
+        "--no-metrics",
+        action="store_true",
+        help="Don't record per-call API metrics"
+    )
+    parser.add_argument(
+        "--metrics-file",
+        type=str,
+        default="metrics.prom",
+        help="Prometheus textfile the API call metrics are written to (relative paths go to logs/)"
+    )
+    parser.add_argument(
+        "--metrics-json",
+        type=str,
+        default="metrics.json",
+        help="JSON file the API call metrics are written to (relative paths go to logs/)"
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=30,
+        help="Seconds between metrics exports during a run (0 exports at the end only)"
+    )
     return parser.parse_args()
\ No newline at end of file
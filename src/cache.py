@@ -0,0 +1,178 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from .track import Track, normalize
+
+DAY = 24 * 60 * 60
+
+
+class CacheEntry(NamedTuple):
+    video_id: Optional[str]
+    candidates: List[Dict[str, Any]]
+    score: Optional[float] = None
+
+
+class MatchCache:
+    """
+    On-disk cache of Yandex.Music -> YouTube Music matches stored in SQLite.
+
+    Entries are keyed by the Yandex track id (when known) and by the normalized
+    (artist, name) pair. A match with video_id None is a "not found" result and
+    expires after its own, shorter TTL. Each entry records the version of the
+    scorer that decided it, and lookups skip entries of another version, so
+    changing the threshold or the feature weights takes effect immediately.
+    """
+
+    def __init__(
+        self,
+        path: str = "match_cache.sqlite",
+        ttl: float = 30 * DAY,
+        not_found_ttl: float = 3 * DAY,
+        max_entries: int = 200_000,
+        refresh: bool = False,
+    ):
+        """
+        Args:
+            path: SQLite database file
+            ttl: Lifetime of a found match in seconds
+            not_found_ttl: Lifetime of a "not found" result in seconds
+            max_entries: Least recently used entries above this size are evicted
+            refresh: Ignore existing entries on lookup, but still store new results
+        """
+        self.path = path
+        self.ttl = ttl
+        self.not_found_ttl = not_found_ttl
+        self.max_entries = max_entries
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS matches (
+                key TEXT PRIMARY KEY,
+                video_id TEXT,
+                candidates TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                score REAL,
+                scorer TEXT
+            )
+            """
+        )
+        # Caches created before entries were versioned: their rows have no scorer and never match
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(matches)")}
+        for column, kind in (("score", "REAL"), ("scorer", "TEXT")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE matches ADD COLUMN {column} {kind}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS matches_accessed_at ON matches (accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def _keys(track: Track) -> List[str]:
+        keys = []
+        if track.id:
+            keys.append(f"ya:{track.id}")
+        keys.append(f"q:{normalize(track.artist)}\t{normalize(track.name)}")
+        return keys
+
+    @staticmethod
+    def _compact(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Keep only the search result fields needed to re-rank candidates"""
+        return {
+            "videoId": result.get("videoId"),
+            "title": result.get("title"),
+            "artists": [{"name": a.get("name")} for a in result.get("artists") or []],
+            "duration_seconds": result.get("duration_seconds"),
+            "category": result.get("category"),
+        }
+
+    def get(self, track: Track, scorer: Optional[str] = None) -> Optional[CacheEntry]:
+        """
+        Return the cached match for a track, or None on a miss or expired entry.
+
+        Args:
+            track: Track to look up
+            scorer: MatchScorer.version of the current settings, entries decided
+                by another version are treated as a miss
+        """
+        if self.refresh:
+            self.misses += 1
+            return None
+
+        now = time.time()
+        with self._lock:
+            for key in self._keys(track):
+                row = self._conn.execute(
+                    "SELECT video_id, candidates, created_at, score, scorer FROM matches WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    continue
+                video_id, candidates, created_at, score, version = row
+                if scorer is not None and version != scorer:
+                    continue
+                ttl = self.ttl if video_id else self.not_found_ttl
+                if now - created_at > ttl:
+                    continue
+                self._conn.execute("UPDATE matches SET accessed_at = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+                self.hits += 1
+                return CacheEntry(video_id, json.loads(candidates), score)
+
+            self.misses += 1
+        return None
+
+    def put(
+        self,
+        track: Track,
+        video_id: Optional[str],
+        candidates: List[Dict[str, Any]],
+        score: Optional[float] = None,
+        scorer: Optional[str] = None,
+    ) -> None:
+        """
+        Store a match (video_id None marks the track as not found).
+
+        Args:
+            track: Matched track
+            video_id: Accepted search result or None
+            candidates: Search results
+            score: Confidence of the best search result
+            scorer: MatchScorer.version that made the decision
+        """
+        now = time.time()
+        data = json.dumps([self._compact(c) for c in candidates], ensure_ascii=False)
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO matches (key, video_id, candidates, created_at, accessed_at, score, scorer) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(key, video_id, data, now, now, score, scorer) for key in self._keys(track)],
+            )
+            self._conn.commit()
+            self._puts += 1
+            if self._puts % 1000 == 0:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries above max_entries"""
+        count = self._conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        self._conn.execute(
+            "DELETE FROM matches WHERE key IN "
+            "(SELECT key FROM matches ORDER BY accessed_at ASC LIMIT ?)",
+            (count - self.max_entries,),
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._evict()
+            self._conn.close()
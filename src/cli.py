@@ -1,15 +1,47 @@
-import json
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, Tuple
+
+from .clients import Clients
+from .journal import TransferJournal, DONE_STATUSES
+from .report import TransferReport
+from .track import Track
+
+if TYPE_CHECKING:
+    from .yamusic import YaMusicHandle
+    from .ytmusic import YTMusicClient
+
+# Menu number -> command name, used to name profiles
+YTMUSIC_COMMANDS = {
+    '1': 'list', '2': 'artists', '3': 'tracks', '4': 'print', '5': 'playlist_map',
+    '6': 'distribute', '7': 'download', '8': 'download_track', '9': 'refresh',
+}
+YAMUSIC_COMMANDS = {
+    '1': 'transfer', '2': 'download_playlists', '3': 'download_liked', '4': 'playlist_map',
+    '5': 'p', '6': 'sync', '7': 'refresh',
+}
 
-from .yamusic import YaMusicHandle
-from .ytmusic import YTMusicClient
 
 class CLI:
-    def __init__(self, yamusic: YaMusicHandle, ytmusic: YTMusicClient, args):
-        self.yamusic = yamusic
-        self.ytmusic = ytmusic
+    def __init__(self, clients: Clients, args):
+        self.clients = clients
         self.args = args
         self.running = True
         self.mode = None  # 'ytmusic' or 'yamusic'
+        self.profiler = None
+        if getattr(args, 'profile', False):
+            from .profiling import CommandProfiler
+
+            self.profiler = CommandProfiler('logs', top=getattr(args, 'profile_top', 20))
+
+    @property
+    def yamusic(self) -> "YaMusicHandle":
+        """Yandex.Music client, initialized by the first command that uses it"""
+        return self.clients.yamusic
+
+    @property
+    def ytmusic(self) -> "YTMusicClient":
+        """YouTube Music client, initialized by the first command that uses it"""
+        return self.clients.ytmusic
         
     def print_mode_selection(self):
         """Display mode selection menu"""
@@ -34,6 +66,7 @@ class CLI:
         print("6. Distribute tracks by playlists")
         print("7. Download all user playlists")
         print("8. Download track")
+        print("9. Refresh library mirror")
         print("b, back - Return to mode selection")
         print("q, quit, exit - Exit program")
         print("="*50)
@@ -49,6 +82,7 @@ class CLI:
         print("4. Get playlist map")
         print("5. Playlist changes")
         print("6. Sync playlists from yaml")
+        print("7. Refresh library mirror")
         print("b, back - Return to mode selection")
         print("q, quit, exit - Exit program")
         print("="*50)
@@ -74,47 +108,126 @@ class CLI:
             print(f"Error getting playlist artists: {e}")
 
     def move_tracks(self, out_path: str) -> None:
-        data = {
-            'liked_tracks': [],
-            'not_found': [],
-            'errors': [],
-        }
-        
-        print('Exporting liked tracks from Yandex Music...')
-        tracks = self.yamusic.export_liked_tracks()
-        tracks.reverse()
+        resume = getattr(self.args, 'resume', False)
+        journal_path = getattr(self.args, 'journal', None) or f'{out_path}.journal.jsonl'
+        journal = TransferJournal(journal_path, resume=resume)
+        records = journal.load() if resume else {}
+
+        delta = None
+        stream = False
+        if records:
+            tracks = [journal.to_track(record) for record in records.values()]
+            print(f'Resuming transfer of {len(tracks)} tracks from {journal_path}')
+        elif getattr(self.args, 'new_likes_only', False):
+            print('Exporting tracks liked since the last transfer from Yandex Music...')
+            delta = self.yamusic.liked_tracks_delta('transfer')
+            tracks = list(delta.added)
+            tracks.reverse()
+            if delta.removed:
+                print(f'{len(delta.removed)} tracks were unliked since the last transfer')
+            journal.record_pending(tracks)
+        elif getattr(self.args, 'stream', False):
+            # Tracks are exported while earlier ones are searched and liked, see below
+            stream = True
+            tracks = []
+        else:
+            print('Exporting liked tracks from Yandex Music...')
+            tracks = self.yamusic.export_liked_tracks()
+            tracks.reverse()
+            journal.record_pending(tracks)
+
+        done = {key for key, record in records.items() if record['status'] in DONE_STATUSES}
+        records = {}  # only the done keys are needed from here on
+        pending = [track for track in tracks if journal.key(track) not in done]
+        if done:
+            print(f'Skipping {len(tracks) - len(pending)} tracks already done')
+
+        # Outcomes are written to the report as they come, nothing is collected
+        report = TransferReport(out_path)
+        error_ids = []
+        target_playlist = getattr(self.args, 'target_playlist', None)
+        try:
+            if stream:
+                outcomes = self.stream_tracks(journal, target_playlist)
+            else:
+                if target_playlist:
+                    print(f'Importing liked tracks to Youtube Music playlist {target_playlist}...')
+                    self.ytmusic.import_tracks_to_playlist(
+                        pending,
+                        target_playlist,
+                        chunk_size=getattr(self.args, 'playlist_chunk_size', 100),
+                        journal=journal,
+                    )
+                else:
+                    print('Importing liked tracks to Youtube Music...')
+                    self.ytmusic.import_liked_tracks(pending, journal=journal)
+                # Read the outcome back from the journal, so a resumed run reports earlier runs too
+                outcomes = self._journaled_outcomes(journal, tracks)
 
+            for track, status in outcomes:
+                report.add(track, status)
+                if delta is not None and report.section(status) == 'errors':
+                    error_ids.append(track.id)
+        finally:
+            journal.close()
+            report.close()
+
+        if delta is not None:
+            # Failed tracks stay unseen, so the next transfer picks them up again
+            self.yamusic.commit_likes_delta(delta, exclude=error_ids)
+
+        print(f'\nSummary: {report.counts["liked_tracks"]} total tracks')
+        print(f'Successfully imported: {report.imported}')
+        print(f'Not found: {report.counts["not_found"]} tracks')
+        print(f'Errors: {report.counts["errors"]} tracks')
+
+    @staticmethod
+    def _journaled_outcomes(journal: TransferJournal, tracks: Iterable[Track]) -> Iterator[Tuple[Track, str]]:
+        """(track, status) pairs with the latest status journaled for each track"""
+        statuses = journal.statuses()
         for track in tracks:
-            data['liked_tracks'].append({
-                'artist': track.artist,
-                'name': track.name
-            })
-
-        print('Importing liked tracks to Youtube Music...')
-        not_found, errors = self.ytmusic.import_liked_tracks(tracks)
-
-        for track in not_found:
-            data['not_found'].append({
-                'artist': track.artist,
-                'name': track.name
-            })
-            print(f'Not found: {track.artist} - {track.name}')
-        
-        for track in errors:
-            data['errors'].append({
-                'artist': track.artist,
-                'name': track.name
-            })
-            print(f'Error: {track.artist} - {track.name}')
-        
-        print(f'\nSummary: {len(tracks)} total tracks')
-        print(f'Successfully imported: {len(tracks) - len(not_found) - len(errors)}')
-        print(f'Not found: {len(not_found)} tracks')
-        print(f'Errors: {len(errors)} tracks')
-
-        str_data = json.dumps(data, indent=2, ensure_ascii=False)
-        with open(out_path, 'w', encoding='utf-8') as f:
-            f.write(str_data)
+            yield track, statuses[journal.key(track)]
+
+    def stream_tracks(
+        self, journal: TransferJournal, target_playlist: Optional[str] = None
+    ) -> Iterator[Tuple[Track, str]]:
+        """
+        Export liked tracks and import them at the same time.
+
+        The export is resolved oldest first, which is the order the staged
+        transfer imports and reports in, and feeds a bounded queue drained by
+        the search/like workers. Each track is journaled as pending before it
+        is queued. Liked tracks are yielded as soon as their outcome is known,
+        a target playlist is only written once every track is matched.
+
+        Returns:
+            Iterator of (track, status) in transfer order
+        """
+        track_shorts = self.yamusic.liked_track_shorts()
+        print(f'Streaming {len(track_shorts)} liked tracks from Yandex Music to Youtube Music...')
+
+        def exported() -> Iterator[Track]:
+            for track in self.yamusic.iter_liked_tracks(track_shorts, reverse=True, progress=False):
+                journal.record_pending([track])
+                yield track
+
+        queue_size = getattr(self.args, 'stream_queue_size', 100)
+        if target_playlist:
+            tracks, _, _ = self.ytmusic.stream_tracks_to_playlist(
+                exported(),
+                target_playlist,
+                total=len(track_shorts),
+                chunk_size=getattr(self.args, 'playlist_chunk_size', 100),
+                queue_size=queue_size,
+                journal=journal,
+            )
+            return self._journaled_outcomes(journal, tracks)
+        return self.ytmusic.iter_liked_imports(
+            exported(),
+            total=len(track_shorts),
+            queue_size=queue_size,
+            journal=journal,
+        )
     
     def transfer_tracks(self):
         """Transfer tracks from Yandex Music to YouTube Music"""
@@ -124,6 +237,19 @@ class CLI:
         else:
             print("Transfer cancelled.")
     
+    def profiled(self, name: str):
+        """Profile of a command with --profile, a no-op context otherwise"""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.profile(name)
+
+    def _profiled_command(self, commands, command):
+        """Profile of a dispatched menu command, named after the command"""
+        name = commands.get(command, command)
+        if name not in commands.values():
+            return nullcontext()
+        return self.profiled(f'{self.mode}_{name}')
+
     def handle_ytmusic_command(self, command):
         """Handle YouTube Music specific commands"""
         if command in ['1', 'list']:
@@ -140,11 +266,17 @@ class CLI:
         elif command in ['5', 'playlist_map']:
             self.ytmusic.update_playlists_map("1.yaml")
         elif command in ['6', 'distribute']:
-            self.ytmusic.distribute_tracks()
+            self.ytmusic.distribute_tracks(any_artist=getattr(self.args, 'any_artist', False))
         elif command in ['7', 'download']:
-            self.ytmusic.download_all_playlists()
+            self.ytmusic.download_all_playlists(
+                workers=getattr(self.args, 'download_workers', 4),
+                per_playlist_workers=getattr(self.args, 'per_playlist_workers', None),
+                export_yaml=getattr(self.args, 'yaml_track_maps', False),
+            )
         elif command in ['8', 'download_track']:
             self.ytmusic.download_track("9zhK-QaEYZY")
+        elif command in ['9', 'refresh']:
+            self.ytmusic.refresh_mirror()
         elif command in ['b', 'back']:
             self.mode = None
             print("Returning to mode selection...")
@@ -156,15 +288,17 @@ class CLI:
         if command in ['1', 'transfer']:
             self.transfer_tracks()
         elif command in ['2', 'download_playlists']:
-            self.yamusic.download_playlists()
+            self.yamusic.download_playlists(workers=getattr(self.args, 'download_workers', None))
         elif command in ['3', 'download_liked']:
-            self.yamusic.download_like_tracks()
+            self.yamusic.download_like_tracks(workers=getattr(self.args, 'download_workers', None))
         elif command in ['4', 'playlist_map']:
             self.yamusic.playlist_map()
         elif command in ['5', 'p']:
-            self.yamusic.check_tracks()
+            self.yamusic.check_tracks(incremental=getattr(self.args, 'new_likes_only', False))
         elif command in ['6', 'sync']:
-            self.yamusic.sync_playlists_from_yaml()
+            self.yamusic.sync_playlists_from_yaml(incremental=not getattr(self.args, 'full_sync', False))
+        elif command in ['7', 'refresh']:
+            self.yamusic.refresh_mirror()
         elif command in ['b', 'back']:
             self.mode = None
             print("Returning to mode selection...")
@@ -209,7 +343,8 @@ class CLI:
                     elif command in ['help', '?', '']:
                         self.print_ytmusic_menu()
                     else:
-                        self.handle_ytmusic_command(command)
+                        with self._profiled_command(YTMUSIC_COMMANDS, command):
+                            self.handle_ytmusic_command(command)
                 
                 # Yandex Music mode
                 elif self.mode == 'yamusic':
@@ -221,7 +356,8 @@ class CLI:
                     elif command in ['help', '?', '']:
                         self.print_yamusic_menu()
                     else:
-                        self.handle_yamusic_command(command)
+                        with self._profiled_command(YAMUSIC_COMMANDS, command):
+                            self.handle_yamusic_command(command)
             
             except KeyboardInterrupt:
                 print("\n\nGoodbye!")
@@ -0,0 +1,145 @@
+import logging
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    from .cache import MatchCache
+    from .metrics import Metrics
+    from .mirror import LibraryMirror
+    from .store import ContentStore
+    from .yamusic import YaMusicHandle
+    from .ytmusic import YTMusicClient
+
+logger = logging.getLogger(__name__)
+
+
+class Clients:
+    """
+    API clients of one run and the stores they share, built on first use.
+
+    Nothing is imported or initialized until a command needs it: working with
+    YouTube Music only never loads yandex_music or authenticates on
+    Yandex.Music, and vice versa.
+    """
+
+    def __init__(self, args, config: Dict[str, Any]):
+        self.args = args
+        self.config = config
+        self._mirror: Optional["LibraryMirror"] = None
+        self._store: Optional["ContentStore"] = None
+        self._cache: Optional["MatchCache"] = None
+        self._yamusic: Optional["YaMusicHandle"] = None
+        self._ytmusic: Optional["YTMusicClient"] = None
+        self._metrics: Optional["Metrics"] = None
+
+    @property
+    def metrics(self) -> Optional["Metrics"]:
+        if self._metrics is None and not self.args.no_metrics:
+            from .metrics import Metrics
+
+            self._metrics = Metrics()
+        return self._metrics
+
+    @property
+    def mirror(self) -> Optional["LibraryMirror"]:
+        if self._mirror is None and not self.args.no_mirror:
+            from .mirror import LibraryMirror, MINUTE
+
+            logger.info(f"Library mirror: {self.args.mirror_file}")
+            self._mirror = LibraryMirror(
+                self.args.mirror_file,
+                max_age=None if self.args.offline else self.args.mirror_max_age_minutes * MINUTE,
+                refresh=self.args.refresh_mirror,
+            )
+        return self._mirror
+
+    @property
+    def store(self) -> Optional["ContentStore"]:
+        if self._store is None and self.args.store:
+            from .store import ContentStore
+
+            self._store = ContentStore(self.args.store, link=self.args.store_link)
+        return self._store
+
+    @property
+    def cache(self) -> Optional["MatchCache"]:
+        if self._cache is None and not self.args.no_cache:
+            from .cache import MatchCache, DAY
+
+            logger.info(f"Match cache: {self.args.cache_file}")
+            self._cache = MatchCache(
+                self.args.cache_file,
+                ttl=self.args.cache_ttl_days * DAY,
+                not_found_ttl=self.args.cache_not_found_ttl_days * DAY,
+                max_entries=self.args.cache_max_entries,
+                refresh=self.args.refresh_cache,
+            )
+        return self._cache
+
+    def _timeout(self):
+        return (self.args.connect_timeout, self.args.read_timeout)
+
+    @property
+    def yamusic(self) -> "YaMusicHandle":
+        if self._yamusic is None:
+            from .transport import Transport
+            from .yamusic import YaMusicHandle
+
+            args = self.args
+            logger.info("Initializing Yandex.Music client...")
+            transport = Transport(
+                "yamusic",
+                rate=args.yamusic_rate or None,
+                retries=args.http_retries,
+                backoff=args.http_backoff,
+                timeout=self._timeout(),
+                pool_size=max(10, args.export_workers, args.download_workers),
+            )
+            self._yamusic = YaMusicHandle(
+                self.config["token"],
+                chunk_size=args.chunk_size,
+                max_workers=args.export_workers,
+                download_workers=args.download_workers,
+                store=self.store,
+                mirror=self.mirror,
+                transport=transport,
+                account_ttl=args.account_ttl_minutes * 60,
+                metrics=self.metrics,
+            )
+        return self._yamusic
+
+    @property
+    def ytmusic(self) -> "YTMusicClient":
+        if self._ytmusic is None:
+            from .matching import MatchScorer
+            from .transport import Transport, YTMUSIC_READ_PATHS
+            from .ytmusic import YTMusicClient
+
+            args = self.args
+            logger.info("Initializing YouTube Music client...")
+            transport = Transport(
+                "ytmusic",
+                rate=args.ytmusic_rate or None,
+                retries=args.http_retries,
+                backoff=args.http_backoff,
+                timeout=self._timeout(),
+                pool_size=max(10, args.import_workers),
+                proxy=None if args.no_proxy else f"socks5://127.0.0.1:{args.proxy_port}",
+                idempotent_paths=YTMUSIC_READ_PATHS,
+            )
+            self._ytmusic = YTMusicClient(
+                workers=args.import_workers,
+                cache=self.cache,
+                scorer=MatchScorer(threshold=args.match_threshold),
+                store=self.store,
+                mirror=self.mirror,
+                transport=transport,
+                metrics=self.metrics,
+            )
+        return self._ytmusic
+
+    def close(self) -> None:
+        if self._cache is not None:
+            logger.info(f"Match cache: {self._cache.hits} hits, {self._cache.misses} misses")
+            self._cache.close()
+        if self._mirror is not None:
+            self._mirror.close()
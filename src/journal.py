@@ -0,0 +1,145 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .track import Track, normalize
+
+PENDING = "pending"
+MATCHED = "matched"
+LIKED = "liked"
+ADDED = "added"
+NOT_FOUND = "not_found"
+ERROR = "error"
+
+# Outcomes that don't need to be retried on resume
+DONE_STATUSES = (LIKED, ADDED, NOT_FOUND)
+
+
+class TransferJournal:
+    """
+    Append-only JSON Lines journal of the likes transfer.
+
+    Every exported track is first recorded as pending, then each outcome
+    (matched videoId, liked or added to a playlist, not found, error) is appended and flushed to disk
+    as soon as it is known. The latest record of a track wins on load.
+    """
+
+    def __init__(self, path: str, resume: bool = False):
+        """
+        Args:
+            path: Journal file
+            resume: Keep the existing journal instead of starting a new one
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+
+    @staticmethod
+    def key(track: Track) -> str:
+        if track.id:
+            return f"ya:{track.id}"
+        return f"q:{normalize(track.artist)}\t{normalize(track.name)}"
+
+    def _write(self, records: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            for record in records:
+                self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def record(
+        self,
+        track: Track,
+        status: str,
+        video_id: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Append the outcome of a track"""
+        record = {
+            "key": self.key(track),
+            "status": status,
+            "artist": track.artist,
+            "name": track.name,
+            "id": track.id,
+            "ts": time.time(),
+        }
+        if video_id:
+            record["video_id"] = video_id
+        if error:
+            record["error"] = error
+        self._write([record])
+
+    def record_pending(self, tracks: List[Track]) -> None:
+        """Record the exported track list in transfer order"""
+        self._write([
+            {
+                "key": self.key(track),
+                "status": PENDING,
+                "artist": track.artist,
+                "name": track.name,
+                "id": track.id,
+                "duration": track.duration,
+            }
+            for track in tracks
+        ])
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Read the journal back.
+
+        Returns:
+            Latest record per track key, in the order tracks were first journaled.
+            A truncated last line (crash mid-write) is ignored.
+        """
+        records: Dict[str, Dict[str, Any]] = {}
+        if not os.path.exists(self.path):
+            return records
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                previous = records.get(record["key"])
+                if previous is not None:
+                    # A pending record never overrides a known outcome
+                    if record["status"] == PENDING:
+                        continue
+                    for field in ("video_id", "duration"):
+                        if field in previous and field not in record:
+                            record[field] = previous[field]
+                records[record["key"]] = record
+        return records
+
+    def statuses(self) -> Dict[str, str]:
+        """
+        Read only the latest status per track key.
+
+        Same precedence as load(), without keeping whole records, for
+        reporting the outcome of large transfers.
+        """
+        statuses: Dict[str, str] = {}
+        if not os.path.exists(self.path):
+            return statuses
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record["status"] == PENDING and record["key"] in statuses:
+                    continue
+                statuses[record["key"]] = record["status"]
+        return statuses
+
+    @staticmethod
+    def to_track(record: Dict[str, Any]) -> Track:
+        return Track(record["artist"], record["name"], record.get("id"), record.get("duration"))
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
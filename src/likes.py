@@ -0,0 +1,40 @@
+from typing import Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .track import Track
+
+
+class LikesDelta(NamedTuple):
+    """
+    Liked tracks added and removed on Yandex.Music since a consumer last
+    committed the likes it has seen.
+
+    Only the added tracks are hydrated; added_ids also holds the ones that
+    could not be. track_ids holds every liked track id at revision, which is
+    what the consumer commits once it has handled the delta.
+    """
+    consumer: str
+    revision: Optional[int]
+    added: List[Track]
+    added_ids: List[str]
+    removed: List[str]
+    track_ids: List[str]
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added_ids or self.removed)
+
+
+def diff_ids(seen: Iterable[str], current: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """
+    Ids added to and removed from a likes list.
+
+    Returns:
+        Tuple of (added ids in current order, removed ids in seen order)
+    """
+    seen = list(seen)
+    current = list(current)
+    seen_set: Set[str] = set(seen)
+    current_set: Set[str] = set(current)
+    added = [track_id for track_id in current if track_id not in seen_set]
+    removed = [track_id for track_id in seen if track_id not in current_set]
+    return added, removed
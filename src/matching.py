@@ -0,0 +1,152 @@
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from .track import Track, normalize
+
+# A feature scores one (track, candidate) pair in [0, 1], or None when it doesn't apply
+Feature = Callable[[Track, Dict[str, Any]], Optional[float]]
+
+_BRACKETS = re.compile(r"[(\[].*?[)\]]")
+_FEATURING = re.compile(r"\s(feat\.?|ft\.?|featuring)\s.*$")
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+@lru_cache(maxsize=262144)
+def _features(text: str) -> Tuple[str, FrozenSet[str]]:
+    """
+    Memoized (core, tokens) of a title or artist name.
+
+    core is the text without bracketed parts, featured artists and punctuation,
+    tokens is the set of words of the full text.
+    """
+    text = normalize(text)
+    core = " ".join(_PUNCTUATION.sub(" ", _FEATURING.sub("", _BRACKETS.sub(" ", text))).split())
+    return core, frozenset(_PUNCTUATION.sub(" ", text).split())
+
+
+def _dice(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def title_similarity(track: Track, candidate: Dict[str, Any]) -> Optional[float]:
+    title = candidate.get("title")
+    if not title:
+        return 0.0
+    track_core, track_tokens = _features(track.name)
+    core, tokens = _features(title)
+    if track_core and track_core == core:
+        # Same song, possibly a different edition in brackets
+        return 1.0 if track_tokens == tokens else 0.9
+    return _dice(track_tokens, tokens)
+
+
+def artist_overlap(track: Track, candidate: Dict[str, Any]) -> Optional[float]:
+    names = [a.get("name") for a in candidate.get("artists") or [] if a.get("name")]
+    if not names:
+        return 0.0
+    artist, artist_tokens = _features(track.artist)
+    candidate_tokens: FrozenSet[str] = frozenset()
+    for name in names:
+        core, tokens = _features(name)
+        if core == artist:
+            return 1.0
+        candidate_tokens |= tokens
+    return _dice(artist_tokens, candidate_tokens)
+
+
+def duration_delta(
+    track: Track, candidate: Dict[str, Any], tolerance: float = 30.0
+) -> Optional[float]:
+    """1.0 for equal durations, falling linearly to 0.0 at `tolerance` seconds apart"""
+    duration = candidate.get("duration_seconds")
+    if not track.duration or not duration:
+        return None
+    return max(0.0, 1.0 - abs(track.duration - duration) / tolerance)
+
+
+DEFAULT_FEATURES: List[Tuple[float, Feature]] = [
+    (0.5, title_similarity),
+    (0.35, artist_overlap),
+    (0.15, duration_delta),
+]
+
+
+class MatchScorer:
+    """
+    Rank YouTube Music search results against a Yandex.Music track.
+
+    Each candidate gets a confidence in [0, 1]: the weighted mean of the
+    features that apply to it. Features are pluggable (weight, function) pairs.
+    Normalization of titles and artists is memoized, so scoring a batch of
+    search results costs a few set operations per candidate.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.5,
+        features: Optional[Sequence[Tuple[float, Feature]]] = None,
+    ):
+        """
+        Args:
+            threshold: Minimum confidence of an accepted match
+            features: (weight, feature) pairs, DEFAULT_FEATURES if not set
+        """
+        self.threshold = threshold
+        self.features = list(features or DEFAULT_FEATURES)
+
+    @property
+    def version(self) -> str:
+        """Fingerprint of the threshold and weighted features, stored with cached matches"""
+        features = ",".join(
+            f"{weight:g}*{getattr(feature, '__qualname__', repr(feature))}" for weight, feature in self.features
+        )
+        return f"{self.threshold:g}|{features}"
+
+    def score(self, track: Track, candidate: Dict[str, Any]) -> float:
+        total = 0.0
+        weights = 0.0
+        for weight, feature in self.features:
+            value = feature(track, candidate)
+            if value is None:
+                continue
+            total += weight * value
+            weights += weight
+        return total / weights if weights else 0.0
+
+    def score_batch(
+        self, batch: Sequence[Tuple[Track, Sequence[Dict[str, Any]]]]
+    ) -> List[List[float]]:
+        """Score the candidates of many tracks at once, one list of scores per track"""
+        return [
+            [self.score(track, c) if c.get("videoId") else 0.0 for c in candidates]
+            for track, candidates in batch
+        ]
+
+    def best_batch(
+        self, batch: Sequence[Tuple[Track, Sequence[Dict[str, Any]]]]
+    ) -> List[Tuple[Optional[Dict[str, Any]], float]]:
+        """
+        Pick the best candidate of each track.
+
+        Returns:
+            (candidate, confidence) per track. The candidate is None when no
+            candidate reaches the threshold. Ties go to the earlier search result.
+        """
+        result = []
+        for (track, candidates), scores in zip(batch, self.score_batch(batch)):
+            best, confidence = None, 0.0
+            for candidate, score in zip(candidates, scores):
+                if score > confidence:
+                    best, confidence = candidate, score
+            if confidence < self.threshold:
+                best = None
+            result.append((best, confidence))
+        return result
+
+    def best(
+        self, track: Track, candidates: Sequence[Dict[str, Any]]
+    ) -> Tuple[Optional[Dict[str, Any]], float]:
+        return self.best_batch([(track, candidates)])[0]
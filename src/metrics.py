@@ -0,0 +1,260 @@
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds of the call latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PREFIX = "yamusic2ytmusic"
+
+
+class OperationStats:
+    """Counters of one (service, operation)"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors: Dict[str, int] = {}
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # last one is +Inf
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.bytes = 0
+
+    def observe(self, seconds: float, error: Optional[str]) -> None:
+        self.calls += 1
+        if error is not None:
+            self.errors[error] = self.errors.get(error, 0) + 1
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+        self.latency_sum += seconds
+        self.latency_max = max(self.latency_max, seconds)
+
+    def copy(self) -> "OperationStats":
+        stats = OperationStats()
+        stats.calls = self.calls
+        stats.errors = dict(self.errors)
+        stats.buckets = list(self.buckets)
+        stats.latency_sum = self.latency_sum
+        stats.latency_max = self.latency_max
+        stats.bytes = self.bytes
+        return stats
+
+
+class Metrics:
+    """
+    Thread-safe per-call metrics of the API clients.
+
+    Calls are labeled by service ("yamusic", "ytmusic") and operation (the
+    client method or "download"). Only the outermost call of a thread is
+    recorded, so client methods calling each other are counted once.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], OperationStats] = {}
+        self._local = threading.local()
+        self.started_at = time.time()
+
+    def _operation(self, service: str, operation: str) -> OperationStats:
+        key = (service, operation)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats.setdefault(key, OperationStats())
+        return stats
+
+    @contextmanager
+    def track(self, service: str, operation: str):
+        """Record the duration and outcome of the calls made in the block"""
+        depth = getattr(self._local, "depth", 0)
+        if depth:
+            yield
+            return
+        self._local.depth = 1
+        error = None
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self._local.depth = 0
+            self.observe(service, operation, time.perf_counter() - start, error)
+
+    def observe(self, service: str, operation: str, seconds: float, error: Optional[str] = None) -> None:
+        """Record a call measured by the caller, error is the name of its failure"""
+        with self._lock:
+            self._operation(service, operation).observe(seconds, error)
+
+    def add_bytes(self, service: str, operation: str, count: int) -> None:
+        """Account for downloaded bytes"""
+        with self._lock:
+            self._operation(service, operation).bytes += count
+
+    def instrument(self, client: Any, service: str, exclude: Iterable[str] = ()) -> Any:
+        """
+        Record every public method call of a client object.
+
+        The methods are replaced on the instance rather than wrapped in a
+        proxy, so calls made through models holding the client (e.g.
+        track_short.fetch_track()) are recorded too.
+
+        Returns:
+            The same client
+        """
+        exclude = set(exclude)
+        for name, _ in inspect.getmembers(type(client), inspect.isfunction):
+            # camelCase names are aliases of the snake_case methods
+            if name.startswith("_") or not name.islower() or name in exclude:
+                continue
+            setattr(client, name, self._wrap(getattr(client, name), service, name))
+        return client
+
+    def _wrap(self, method, service: str, operation: str):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            with self.track(service, operation):
+                return method(*args, **kwargs)
+        return wrapper
+
+    def snapshot(self) -> List[Tuple[str, str, OperationStats]]:
+        """Copy of the counters as (service, operation, stats), sorted by label"""
+        with self._lock:
+            return [(service, operation, stats.copy()) for (service, operation), stats in sorted(self._stats.items())]
+
+    def to_prometheus(self) -> str:
+        """Counters in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {PREFIX}_calls_total Outbound API calls",
+            f"# TYPE {PREFIX}_calls_total counter",
+        ]
+        for service, operation, stats in snapshot:
+            lines.append(f'{PREFIX}_calls_total{{service="{service}",operation="{operation}"}} {stats.calls}')
+
+        lines += [
+            f"# HELP {PREFIX}_errors_total Failed outbound API calls by exception type",
+            f"# TYPE {PREFIX}_errors_total counter",
+        ]
+        for service, operation, stats in snapshot:
+            for error, count in sorted(stats.errors.items()):
+                lines.append(
+                    f'{PREFIX}_errors_total{{service="{service}",operation="{operation}",exception="{error}"}} {count}'
+                )
+
+        lines += [
+            f"# HELP {PREFIX}_call_duration_seconds Latency of outbound API calls",
+            f"# TYPE {PREFIX}_call_duration_seconds histogram",
+        ]
+        for service, operation, stats in snapshot:
+            labels = f'service="{service}",operation="{operation}"'
+            cumulative = 0
+            for bound, count in zip([*LATENCY_BUCKETS, "+Inf"], stats.buckets):
+                cumulative += count
+                lines.append(f'{PREFIX}_call_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{PREFIX}_call_duration_seconds_sum{{{labels}}} {stats.latency_sum:.6f}")
+            lines.append(f"{PREFIX}_call_duration_seconds_count{{{labels}}} {stats.calls}")
+
+        lines += [
+            f"# HELP {PREFIX}_downloaded_bytes_total Bytes of downloaded tracks",
+            f"# TYPE {PREFIX}_downloaded_bytes_total counter",
+        ]
+        for service, operation, stats in snapshot:
+            if stats.bytes:
+                lines.append(
+                    f'{PREFIX}_downloaded_bytes_total{{service="{service}",operation="{operation}"}} {stats.bytes}'
+                )
+
+        lines += [
+            f"# HELP {PREFIX}_run_start_time_seconds Start of the run as a unix timestamp",
+            f"# TYPE {PREFIX}_run_start_time_seconds gauge",
+            f"{PREFIX}_run_start_time_seconds {self.started_at:.0f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> Dict[str, Any]:
+        operations = []
+        for service, operation, stats in self.snapshot():
+            operations.append({
+                "service": service,
+                "operation": operation,
+                "calls": stats.calls,
+                "errors": stats.errors,
+                "latency": {
+                    "sum": stats.latency_sum,
+                    "mean": stats.latency_sum / stats.calls if stats.calls else 0.0,
+                    "max": stats.latency_max,
+                    "buckets": {str(bound): count for bound, count in zip([*LATENCY_BUCKETS, "+Inf"], stats.buckets)},
+                },
+                "bytes": stats.bytes,
+            })
+        return {"started_at": self.started_at, "updated_at": time.time(), "operations": operations}
+
+    def export(self, prometheus_file: Optional[str] = None, json_file: Optional[str] = None) -> None:
+        """
+        Write the counters to a Prometheus textfile and/or a JSON file.
+
+        Files are replaced atomically, so a scraper never reads a partial file.
+        """
+        if prometheus_file:
+            _write_atomic(prometheus_file, self.to_prometheus())
+        if json_file:
+            _write_atomic(json_file, json.dumps(self.to_dict(), indent=2))
+
+
+def _write_atomic(path: str, content: str) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+class MetricsExporter:
+    """Background thread exporting metrics every `interval` seconds and once more on stop()"""
+
+    def __init__(
+        self,
+        metrics: Metrics,
+        prometheus_file: Optional[str] = None,
+        json_file: Optional[str] = None,
+        interval: float = 30.0,
+    ):
+        self.metrics = metrics
+        self.prometheus_file = prometheus_file
+        self.json_file = json_file
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _export(self) -> None:
+        try:
+            self.metrics.export(self.prometheus_file, self.json_file)
+        except OSError as e:
+            logger.warning(f"Could not export metrics: {e}")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._export()
+
+    def start(self) -> "MetricsExporter":
+        if self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._export()
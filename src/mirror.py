@@ -0,0 +1,113 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, NamedTuple, Optional
+
+MINUTE = 60
+
+
+class MirrorEntry(NamedTuple):
+    version: Optional[str]
+    data: Any
+    fetched_at: float
+
+
+class LibraryMirror:
+    """
+    On-disk mirror of both music libraries stored in SQLite.
+
+    Every entry is addressed by (service, kind, key) and carries the version it
+    was fetched at: the revision of a Yandex.Music playlist or the liked tracks,
+    the track count of a YouTube Music playlist. A versioned entry stays valid
+    as long as the service reports the same version. Library listings have no
+    version of their own and are trusted for max_age seconds, which is what
+    lets read-only commands run without a single API call.
+    """
+
+    def __init__(
+        self,
+        path: str = "library_mirror.sqlite",
+        max_age: Optional[float] = 15 * MINUTE,
+        refresh: bool = False,
+    ):
+        """
+        Args:
+            path: SQLite database file
+            max_age: Seconds a listing is served without asking the service for
+                changes. None never considers an entry stale (offline mode).
+            refresh: Consider every entry stale, versioned entries are still
+                reused when their version hasn't changed
+        """
+        self.path = path
+        self.max_age = max_age
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                service TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                version TEXT,
+                data TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (service, kind, key)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, service: str, kind: str, key: str = "") -> Optional[MirrorEntry]:
+        """Stored entry, None if the mirror has none"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, data, fetched_at FROM entries WHERE service = ? AND kind = ? AND key = ?",
+                (service, kind, key),
+            ).fetchone()
+        if row is None:
+            return None
+        return MirrorEntry(row[0], json.loads(row[1]), row[2])
+
+    def is_fresh(self, entry: Optional[MirrorEntry]) -> bool:
+        """Whether an entry can be served without checking the service for changes"""
+        if entry is None or self.refresh:
+            return False
+        return self.max_age is None or time.time() - entry.fetched_at <= self.max_age
+
+    def put(self, service: str, kind: str, key: str, version: Any, data: Any) -> None:
+        """Store an entry fetched now at the given version"""
+        version = None if version is None else str(version)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (service, kind, key, version, data, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (service, kind, key, version, json.dumps(data, ensure_ascii=False), time.time()),
+            )
+            self._conn.commit()
+
+    def touch(self, service: str, kind: str, key: str = "") -> None:
+        """Mark an entry as checked now, after the service reported the same version"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE entries SET fetched_at = ? WHERE service = ? AND kind = ? AND key = ?",
+                (time.time(), service, kind, key),
+            )
+            self._conn.commit()
+
+    def invalidate(self, service: str, kind: str, key: Optional[str] = None) -> None:
+        """Drop an entry after a write, or every entry of the kind when key is None"""
+        with self._lock:
+            if key is None:
+                self._conn.execute("DELETE FROM entries WHERE service = ? AND kind = ?", (service, kind))
+            else:
+                self._conn.execute(
+                    "DELETE FROM entries WHERE service = ? AND kind = ? AND key = ?", (service, kind, key)
+                )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
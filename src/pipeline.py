@@ -0,0 +1,195 @@
+import time
+from contextlib import ExitStack
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import yaml
+
+from .cli import CLI
+from .clients import Clients
+
+
+# Playlists map written by yt.playlist_map and read by yt.distribute
+PLAYLISTS_MAP_FILE = "playlists_map.yaml"
+
+
+class StepResult(NamedTuple):
+    name: str
+    seconds: float
+    error: Optional[str] = None
+
+
+def load_steps(path: str) -> Tuple[List[Tuple[str, Dict[str, Any]]], bool]:
+    """
+    Read a pipeline file.
+
+    The file holds either a list of steps or a mapping with a `steps` list and
+    an optional `continue_on_error` flag. A step is a step name or a
+    single-key mapping of the name to its parameters:
+
+        steps:
+          - yt.playlist_map
+          - yt.distribute: {any_artist: true}
+          - yt.download
+
+    Returns:
+        Tuple of ([(step name, parameters)], continue_on_error)
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or []
+
+    continue_on_error = False
+    if isinstance(data, dict):
+        continue_on_error = bool(data.get("continue_on_error", False))
+        data = data.get("steps") or []
+
+    steps = []
+    for step in data:
+        if isinstance(step, str):
+            steps.append((step, {}))
+        elif isinstance(step, dict) and len(step) == 1:
+            name, params = next(iter(step.items()))
+            steps.append((name, params or {}))
+        else:
+            raise ValueError(f"Invalid pipeline step: {step!r}")
+    return steps, continue_on_error
+
+
+class Pipeline:
+    """
+    Non-interactive runner of CLI commands.
+
+    All steps run in one process on the same clients with their libraries
+    pinned, so a playlist listing or playlist fetched by one step is reused by
+    the following ones instead of being fetched again.
+    """
+
+    def __init__(self, clients: Clients, args):
+        self.clients = clients
+        self.args = args
+        self.cli = CLI(clients, args)
+
+    @property
+    def yamusic(self):
+        return self.clients.yamusic
+
+    @property
+    def ytmusic(self):
+        return self.clients.ytmusic
+
+    def _print_tracks(self) -> None:
+        tracks = self.ytmusic.get_track_out_playlist()
+        self.ytmusic.print_tracks(tracks)
+
+    def steps(self) -> Dict[str, Tuple[Tuple[str, ...], Callable[[], Callable[..., Any]], Dict[str, Any]]]:
+        """
+        Available steps: name -> (services used, getter of the callable,
+        default parameters taken from the command line).
+
+        Callables are resolved through a getter, so only the clients of the
+        steps that actually run are initialized.
+        """
+        args = self.args
+        return {
+            "yt.list": (("yt",), lambda: self.cli.list_playlists, {}),
+            "yt.tracks": (("yt",), lambda: self.ytmusic.get_track_out_playlist, {}),
+            "yt.print": (("yt",), lambda: self._print_tracks, {}),
+            "yt.playlist_map": (
+                ("yt",),
+                lambda: self.ytmusic.update_playlists_map,
+                {"output_file": PLAYLISTS_MAP_FILE},
+            ),
+            "yt.distribute": (
+                ("yt",),
+                lambda: self.ytmusic.distribute_tracks,
+                {"any_artist": getattr(args, "any_artist", False), "map_file": PLAYLISTS_MAP_FILE},
+            ),
+            "yt.download": (
+                ("yt",),
+                lambda: self.ytmusic.download_all_playlists,
+                {
+                    "workers": getattr(args, "download_workers", 4),
+                    "per_playlist_workers": getattr(args, "per_playlist_workers", None),
+                    "export_yaml": getattr(args, "yaml_track_maps", False),
+                },
+            ),
+            "yt.refresh": (("yt",), lambda: self.ytmusic.refresh_mirror, {}),
+            "ya.transfer": (("ya", "yt"), lambda: self.cli.move_tracks, {"out_path": args.output}),
+            "ya.download_playlists": (
+                ("ya",),
+                lambda: self.yamusic.download_playlists,
+                {"workers": getattr(args, "download_workers", None)},
+            ),
+            "ya.download_liked": (
+                ("ya",),
+                lambda: self.yamusic.download_like_tracks,
+                {"workers": getattr(args, "download_workers", None)},
+            ),
+            "ya.playlist_map": (("ya",), lambda: self.yamusic.playlist_map, {}),
+            "ya.check": (
+                ("ya",),
+                lambda: self.yamusic.check_tracks,
+                {"incremental": getattr(args, "new_likes_only", False)},
+            ),
+            "ya.sync": (
+                ("ya",),
+                lambda: self.yamusic.sync_playlists_from_yaml,
+                {"incremental": not getattr(args, "full_sync", False)},
+            ),
+            "ya.refresh": (("ya",), lambda: self.yamusic.refresh_mirror, {}),
+        }
+
+    def run(self, steps: List[Tuple[str, Dict[str, Any]]], continue_on_error: bool = False) -> List[StepResult]:
+        """
+        Run steps in order and report the time each of them took.
+
+        Args:
+            steps: (step name, parameters) pairs, parameters override the defaults
+            continue_on_error: Run the remaining steps after a step failed
+
+        Returns:
+            Result of every step that ran
+        """
+        available = self.steps()
+        unknown = [name for name, _ in steps if name not in available]
+        if unknown:
+            raise ValueError(f"Unknown pipeline steps: {', '.join(unknown)}. Available: {', '.join(available)}")
+
+        results = []
+        pinned = set()
+        with ExitStack() as stack:
+            for i, (name, params) in enumerate(steps, start=1):
+                services, get_func, defaults = available[name]
+                print(f"\n[{i}/{len(steps)}] {name}")
+                start = time.perf_counter()
+                error = None
+                try:
+                    # Pin a library the first time a step uses it, initializing its client
+                    for service in services:
+                        if service not in pinned:
+                            client = self.yamusic if service == "ya" else self.ytmusic
+                            stack.enter_context(client.pinned_library())
+                            pinned.add(service)
+                    with self.cli.profiled(name):
+                        get_func()(**{**defaults, **params})
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                    print(f"Step {name} failed: {error}")
+                results.append(StepResult(name, time.perf_counter() - start, error))
+                if error is not None and not continue_on_error:
+                    break
+
+        self.print_report(results, len(steps))
+        return results
+
+    @staticmethod
+    def print_report(results: List[StepResult], total_steps: int) -> None:
+        print("\n" + "=" * 50)
+        print("PIPELINE SUMMARY")
+        print("=" * 50)
+        for result in results:
+            status = "ok" if result.error is None else f"failed ({result.error})"
+            print(f"  {result.name:<24} {result.seconds:8.1f}s  {status}")
+        if len(results) < total_steps:
+            print(f"  {total_steps - len(results)} steps not run")
+        print(f"  Total: {sum(result.seconds for result in results):.1f}s")
+        print("=" * 50)
@@ -0,0 +1,113 @@
+import cProfile
+import io
+import pstats
+import re
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+
+class CommandProfiler:
+    """
+    Profile commands one at a time with cProfile and tracemalloc.
+
+    Each profiled command leaves three files named after it in the output
+    directory: <name>.prof (cProfile stats, for pstats or snakeviz),
+    <name>.tracemalloc (snapshot taken when the command finished, for
+    tracemalloc.Snapshot.load) and <name>.txt, a summary of the top
+    functions and allocating lines that is also printed.
+
+    Since Python 3.12 cProfile sees the worker threads of a command too.
+    Their calls interleave with the calling thread's, so per-call counts of
+    functions running in several threads at once are approximate.
+    """
+
+    def __init__(self, directory: str = "logs", top: int = 20, frames: int = 1):
+        """
+        Args:
+            directory: Directory the profiles are written to
+            top: Number of functions and allocation sites in the summary
+            frames: Frames kept per allocation traceback
+        """
+        self.directory = Path(directory)
+        self.top = top
+        self.frames = frames
+
+    @contextmanager
+    def profile(self, name: str):
+        """Profile the block and write its profile files, also when it raises"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        safe_name = re.sub(r"[^\w.-]+", "_", name)
+        base = self.directory / f"profile_{safe_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(self.frames)
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            seconds = time.perf_counter() - start
+            after = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+
+            profiler.dump_stats(f"{base}.prof")
+            after.dump(f"{base}.tracemalloc")
+            summary = self._summary(name, seconds, profiler, before, after, current, peak)
+            with open(f"{base}.txt", "w", encoding="utf-8") as f:
+                f.write(summary)
+            print(summary)
+            print(f"Profile of {name} saved to {base}.prof, {base}.tracemalloc and {base}.txt")
+
+    def _summary(
+        self,
+        name: str,
+        seconds: float,
+        profiler: cProfile.Profile,
+        before: tracemalloc.Snapshot,
+        after: tracemalloc.Snapshot,
+        current: int,
+        peak: int,
+    ) -> str:
+        lines: List[str] = [
+            "=" * 50,
+            f"PROFILE: {name}",
+            "=" * 50,
+            f"Wall time: {seconds:.2f}s",
+            f"Traced memory: {current / 2**20:.1f} MiB at the end, {peak / 2**20:.1f} MiB peak",
+        ]
+
+        for sort, title in (("tottime", "own time"), ("cumulative", "cumulative time")):
+            out = io.StringIO()
+            stats = pstats.Stats(profiler, stream=out)
+            stats.strip_dirs().sort_stats(sort).print_stats(self.top)
+            # Skip the header pstats prints before the table
+            table = out.getvalue()
+            table = table[table.find("   ncalls"):] if "   ncalls" in table else table
+            lines += ["", f"Top {self.top} functions by {title}:", table.rstrip()]
+
+        lines += ["", f"Top {self.top} allocation sites by memory still held:"]
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ]
+        diff = after.filter_traces(filters).compare_to(before.filter_traces(filters), "lineno")
+        for stat in diff[:self.top]:
+            frame = stat.traceback[0]
+            lines.append(
+                f"  {stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+8d} blocks  {frame.filename}:{frame.lineno}"
+            )
+        lines.append("=" * 50)
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,80 @@
+import json
+import os
+import tempfile
+from typing import Dict, Optional, TextIO
+
+from .journal import LIKED, ADDED, NOT_FOUND
+from .track import Track
+
+# Report sections in file order
+SECTIONS = ("liked_tracks", "not_found", "errors")
+
+
+class TransferReport:
+    """
+    Transfer report written while outcomes come in.
+
+    The file has the same layout as a json.dumps(..., indent=2) of
+    {"liked_tracks": [...], "not_found": [...], "errors": [...]}, but no
+    section is held in memory: liked_tracks entries go straight to the
+    report, not_found and errors entries to temporary JSON Lines files that
+    are copied after it on close(). Only the counters are kept.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.counts: Dict[str, int] = {section: 0 for section in SECTIONS}
+        self._out: TextIO = open(path, "w", encoding="utf-8")
+        directory = os.path.dirname(os.path.abspath(path))
+        self._spills: Dict[str, TextIO] = {
+            section: tempfile.TemporaryFile("w+", encoding="utf-8", dir=directory) for section in SECTIONS[1:]
+        }
+        self._out.write('{\n  "liked_tracks": [')
+
+    @staticmethod
+    def section(status: str) -> Optional[str]:
+        """Section listing a track besides liked_tracks, None for an imported track"""
+        if status == NOT_FOUND:
+            return "not_found"
+        if status not in (LIKED, ADDED):
+            return "errors"
+        return None
+
+    def _write_entry(self, first: bool, artist: str, name: str) -> None:
+        entry = json.dumps({"artist": artist, "name": name}, indent=2, ensure_ascii=False)
+        self._out.write(("" if first else ",") + "\n    " + entry.replace("\n", "\n    "))
+
+    def add(self, track: Track, status: str) -> None:
+        """Record the outcome of a track, in transfer order"""
+        self._write_entry(not self.counts["liked_tracks"], track.artist, track.name)
+        self.counts["liked_tracks"] += 1
+        section = self.section(status)
+        if section is not None:
+            self._spills[section].write(json.dumps([track.artist, track.name], ensure_ascii=False) + "\n")
+            self.counts[section] += 1
+
+    @property
+    def imported(self) -> int:
+        return self.counts["liked_tracks"] - self.counts["not_found"] - self.counts["errors"]
+
+    def close(self, echo: bool = True) -> None:
+        """
+        Complete the report with the not_found and errors sections.
+
+        Args:
+            echo: Print every track that was not found or failed
+        """
+        self._out.write("\n  ]" if self.counts["liked_tracks"] else "]")
+        for section, label in (("not_found", "Not found"), ("errors", "Error")):
+            self._out.write(f',\n  "{section}": [')
+            spill = self._spills[section]
+            spill.seek(0)
+            for i, line in enumerate(spill):
+                artist, name = json.loads(line)
+                self._write_entry(i == 0, artist, name)
+                if echo:
+                    print(f"{label}: {artist} - {name}")
+            spill.close()
+            self._out.write("\n  ]" if self.counts[section] else "]")
+        self._out.write("\n}")
+        self._out.close()
@@ -0,0 +1,64 @@
+from typing import Any, Callable, Dict, Iterable, List, Sequence, TypeVar
+
+from .track import normalize
+
+T = TypeVar("T")
+
+
+class ArtistIndex:
+    """
+    Inverted index of a playlists map: normalized artist -> playlist names.
+
+    The map has the layout of playlists_map.yaml / yamusic.yaml, i.e.
+    {playlist name: {"artists": [...], ...}}. Compiling it once lets a single
+    pass over the tracks route each of them to all its target playlists.
+    """
+
+    def __init__(self, playlists_map: Dict[str, Dict[str, Any]]):
+        self._index: Dict[str, List[str]] = {}
+        for name, info in playlists_map.items():
+            for artist in (info or {}).get("artists") or []:
+                targets = self._index.setdefault(normalize(str(artist)), [])
+                if name not in targets:
+                    targets.append(name)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def playlists_for(self, artists: Sequence[str], any_artist: bool = False) -> List[str]:
+        """
+        Playlists a track belongs to.
+
+        Args:
+            artists: Credited artists of the track, main artist first
+            any_artist: Route by every credited artist instead of the main one only
+        """
+        if not artists:
+            return []
+        if not any_artist:
+            return self._index.get(normalize(artists[0]), [])
+
+        playlists: List[str] = []
+        for artist in artists:
+            for name in self._index.get(normalize(artist), []):
+                if name not in playlists:
+                    playlists.append(name)
+        return playlists
+
+    def route(
+        self,
+        items: Iterable[T],
+        artists_of: Callable[[T], Sequence[str]],
+        any_artist: bool = False,
+    ) -> Dict[str, List[T]]:
+        """
+        Group items by target playlist in a single pass.
+
+        Returns:
+            Playlist name -> items in input order. Playlists without items are omitted.
+        """
+        buckets: Dict[str, List[T]] = {}
+        for item in items:
+            for name in self.playlists_for(artists_of(item), any_artist):
+                buckets.setdefault(name, []).append(item)
+        return buckets
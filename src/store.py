@@ -0,0 +1,111 @@
+import os
+import shutil
+import threading
+from typing import Callable, Dict, Optional
+
+
+class ContentStore:
+    """
+    Content-addressed store of downloaded tracks.
+
+    Each track is fetched once into <root>/<namespace>/<key>/ (key is the
+    YouTube videoId or the Yandex track id) and playlist folders receive
+    hardlinks or symlinks to the stored file.
+    """
+
+    def __init__(self, root: str = "downloads/.store", link: str = "hardlink"):
+        """
+        Args:
+            root: Store directory
+            link: "hardlink" or "symlink". Hardlinks fall back to symlinks across
+                filesystems, and symlinks fall back to copies where unsupported.
+        """
+        self.root = root
+        self.link_mode = link
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _lock(self, key: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _find(self, key_dir: str, ext: str) -> Optional[str]:
+        if not os.path.isdir(key_dir):
+            return None
+        for name in os.listdir(key_dir):
+            # yt-dlp names unfinished files *.temp.<ext>
+            if name.endswith(f".{ext}") and not name.endswith(f".temp.{ext}"):
+                return os.path.join(key_dir, name)
+        return None
+
+    def fetch(
+        self,
+        namespace: str,
+        key: str,
+        download: Callable[[str], Optional[str]],
+        ext: str = "mp3",
+    ) -> Optional[str]:
+        """
+        Return the stored file of a track, downloading it on first use.
+
+        Concurrent fetches of the same key wait for the first one instead of
+        downloading again. The download goes to a <key>.part directory and
+        the file is moved into the key directory only once download()
+        returned it, so an interrupted or failed download never ends up in
+        the store.
+
+        Args:
+            namespace: "yt" or "ya"
+            key: Track id within the namespace
+            download: Callable downloading the track into the given directory and
+                returning the file path, or None on failure
+            ext: Expected file extension
+
+        Returns:
+            Path of the stored file or None if the download failed
+        """
+        key_dir = os.path.join(self.root, namespace, key)
+        with self._lock(f"{namespace}:{key}"):
+            path = self._find(key_dir, ext)
+            if path is not None:
+                return path
+            part_dir = f"{key_dir}.part"
+            # Leftovers of a download killed in an earlier run
+            shutil.rmtree(part_dir, ignore_errors=True)
+            os.makedirs(part_dir)
+            try:
+                path = download(part_dir)
+                if not path or not os.path.exists(path):
+                    return None
+                os.makedirs(key_dir, exist_ok=True)
+                stored = os.path.join(key_dir, os.path.basename(path))
+                os.replace(path, stored)
+                return stored
+            finally:
+                shutil.rmtree(part_dir, ignore_errors=True)
+
+    def link(self, source: str, destination: str) -> str:
+        """
+        Link a stored file into a playlist folder.
+
+        Returns:
+            Destination path
+        """
+        if os.path.lexists(destination):
+            if os.path.exists(destination) and os.path.samefile(source, destination):
+                return destination
+            os.remove(destination)
+        os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+
+        if self.link_mode == "hardlink":
+            try:
+                os.link(source, destination)
+                return destination
+            except OSError:
+                pass
+        try:
+            os.symlink(os.path.abspath(source), destination)
+        except OSError:
+            shutil.copy2(source, destination)
+        return destination
@@ -1,6 +1,87 @@
-from typing import NamedTuple
+import sys
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Sequence, Tuple
 
 
 class Track(NamedTuple):
     artist: str
     name: str
+    id: Optional[str] = None
+    duration: Optional[int] = None  # seconds
+
+
+class TrackRecord(NamedTuple):
+    """
+    Compact track of either service, holding only the fields the tool uses.
+
+    API responses are projected into records as soon as they are fetched, so
+    thumbnails, covers and the other unused fields are never kept. Artist
+    names are interned, so an artist credited on many tracks is stored once.
+    Records are stored in the library mirror as plain JSON arrays.
+    """
+    title: str
+    artists: Tuple[str, ...] = ()
+    video_id: Optional[str] = None  # YouTube Music
+    id: Optional[str] = None  # Yandex.Music
+    album_id: Optional[str] = None
+    duration: Optional[int] = None  # seconds
+
+    @property
+    def artist(self) -> str:
+        """Main artist"""
+        return self.artists[0] if self.artists else "Unknown Artist"
+
+    @property
+    def track_id(self) -> Optional[str]:
+        """Yandex.Music "id:album_id" reference"""
+        if self.id and self.album_id:
+            return f"{self.id}:{self.album_id}"
+        return self.id
+
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> "TrackRecord":
+        """Record stored as a JSON array"""
+        title, artists, *rest = row
+        return cls(title, intern_artists(artists), *rest)
+
+    @classmethod
+    def from_ytmusic(cls, song: Dict[str, Any]) -> "TrackRecord":
+        """Record of a ytmusicapi song dict"""
+        album = song.get("album") or {}
+        return cls(
+            song.get("title") or "",
+            intern_artists(artist.get("name") for artist in song.get("artists") or []),
+            song.get("videoId"),
+            None,
+            album.get("id"),
+            song.get("duration_seconds"),
+        )
+
+    @classmethod
+    def from_yamusic(cls, track: Any) -> "TrackRecord":
+        """Record of a yandex_music Track, or of a TrackShort with or without its full track"""
+        if hasattr(track, "albums"):
+            full, album_id = track, str(track.albums[0].id) if track.albums else None
+        else:
+            full, album_id = track.track, track.album_id
+            if album_id is None and full is not None and full.albums:
+                album_id = str(full.albums[0].id)
+        if full is None:
+            return cls("", (), None, str(track.id), album_id)
+        return cls(
+            full.title or "",
+            intern_artists(artist.name for artist in full.artists or []),
+            None,
+            str(full.id),
+            album_id,
+            full.duration_ms // 1000 if full.duration_ms else None,
+        )
+
+
+def intern_artists(names: Iterable[Optional[str]]) -> Tuple[str, ...]:
+    """Tuple of interned artist names, skipping empty ones"""
+    return tuple(sys.intern(name) for name in names if name)
+
+
+def normalize(text: str) -> str:
+    """Normalize a title or artist name for matching: casefold and collapse whitespace"""
+    return " ".join(text.casefold().split())
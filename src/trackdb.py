@@ -0,0 +1,101 @@
+import sqlite3
+from typing import Any, Dict, Optional
+
+import yaml
+
+FIELDS = ("video_id", "title", "artist", "file_path", "filename", "playlist", "playlist_id", "downloaded_at")
+
+
+class TrackMapStore:
+    """
+    Download state of all playlists in a single SQLite database (WAL mode).
+
+    Replaces the per-playlist track_map_<playlist>.yaml files: every finished
+    track is committed on its own, and the YAML maps can still be imported
+    from and exported to for reading by hand.
+    """
+
+    def __init__(self, path: str = "downloads/track_maps.sqlite"):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tracks (
+                playlist_id TEXT NOT NULL,
+                video_id TEXT NOT NULL,
+                title TEXT,
+                artist TEXT,
+                file_path TEXT,
+                filename TEXT,
+                playlist TEXT,
+                downloaded_at TEXT,
+                PRIMARY KEY (playlist_id, video_id)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS imported (playlist_id TEXT PRIMARY KEY, yaml_file TEXT)"
+        )
+        self._conn.commit()
+
+    def load(self, playlist_id: str) -> Dict[str, Dict[str, Any]]:
+        """Track map of a playlist: video_id -> track info"""
+        rows = self._conn.execute(
+            f"SELECT {', '.join(FIELDS)} FROM tracks WHERE playlist_id = ?", (playlist_id,)
+        )
+        return {row[0]: dict(zip(FIELDS, row)) for row in rows}
+
+    def put(self, playlist_id: str, info: Dict[str, Any]) -> None:
+        """Store and commit one downloaded track"""
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO tracks ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})",
+            tuple(info.get(field, playlist_id if field == "playlist_id" else None) for field in FIELDS),
+        )
+        self._conn.commit()
+
+    def import_yaml(self, playlist_id: str, yaml_file: str) -> int:
+        """
+        Import a legacy track_map_<playlist>.yaml file once.
+
+        Returns:
+            Number of imported tracks, 0 if the file was imported before
+        """
+        if self._conn.execute(
+            "SELECT 1 FROM imported WHERE playlist_id = ?", (playlist_id,)
+        ).fetchone():
+            return 0
+
+        with open(yaml_file, "r", encoding="utf-8") as f:
+            track_map = yaml.safe_load(f) or {}
+
+        rows = []
+        for video_id, info in track_map.items():
+            info = dict(info or {}, video_id=video_id, playlist_id=playlist_id)
+            rows.append(tuple(info.get(field) for field in FIELDS))
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT OR IGNORE INTO tracks ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})",
+                rows,
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO imported (playlist_id, yaml_file) VALUES (?, ?)",
+                (playlist_id, yaml_file),
+            )
+        return len(rows)
+
+    def export_yaml(self, playlist_id: str, yaml_file: str) -> int:
+        """
+        Write a playlist's track map in the legacy YAML layout.
+
+        Returns:
+            Number of exported tracks
+        """
+        track_map = self.load(playlist_id)
+        with open(yaml_file, "w", encoding="utf-8") as f:
+            yaml.dump(track_map, f, allow_unicode=True, default_flow_style=False)
+        return len(track_map)
+
+    def close(self) -> None:
+        self._conn.close()
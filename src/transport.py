@@ -0,0 +1,247 @@
+import email.utils
+import logging
+import random
+import threading
+import time
+from typing import Iterable, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# Throttled: the request was rejected without being processed, safe to retry for every method
+THROTTLED = 429
+# Server errors: the request may have been processed already, retried for idempotent requests only
+RETRY_STATUSES = (500, 502, 503, 504)
+
+# Methods retried after server errors and read timeouts, as urllib3's Retry does
+IDEMPOTENT_METHODS = frozenset({"DELETE", "GET", "HEAD", "OPTIONS", "PUT", "TRACE"})
+
+# ytmusicapi POSTs its reads too: endpoints that don't change the library
+YTMUSIC_READ_PATHS = (
+    "/youtubei/v1/browse",
+    "/youtubei/v1/search",
+    "/youtubei/v1/next",
+    "/youtubei/v1/player",
+    "/youtubei/v1/music/get_search_suggestions",
+)
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting the request rate of one service.
+
+    Tokens refill at rate per second up to burst. pause() empties the bucket
+    for a while, so every worker backs off together after a 429 instead of
+    each of them running into it again.
+    """
+
+    def __init__(self, rate: Optional[float], burst: Optional[float] = None):
+        """
+        Args:
+            rate: Requests per second, None for no limit
+            burst: Requests that can be sent at once after an idle period
+                (default: one second worth of requests)
+        """
+        self.rate = rate
+        self.burst = max(1.0, burst if burst is not None else (rate or 1.0))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request may be sent"""
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every request for the given number of seconds"""
+        if not self.rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            # Concurrent 429s hold the bucket back for one pause, not one per response
+            self._tokens = min(self._tokens, -seconds * self.rate)
+            self._updated = now
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """
+    HTTPAdapter sending requests through a token bucket and retrying
+    throttled requests and dropped connections.
+
+    A request the server may already have processed (server error, read
+    timeout, connection lost after sending) is only retried when it is
+    idempotent: its method is in IDEMPOTENT_METHODS or its URL path in
+    idempotent_paths. Other requests, e.g. adding playlist items, are only
+    retried when they were throttled or never reached the server, so a
+    retry can't apply a change twice.
+
+    Retries back off exponentially with full jitter. A Retry-After header
+    replaces the computed delay and pauses the whole bucket, so concurrent
+    workers of the same service wait it out together.
+    """
+
+    def __init__(
+        self,
+        bucket: TokenBucket,
+        retries: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 60.0,
+        timeout: Optional[Timeout] = (5.0, 30.0),
+        pool_size: int = 10,
+        idempotent_paths: Iterable[str] = (),
+    ):
+        """
+        Args:
+            bucket: Rate limiter shared by every session of the service
+            retries: Retries of a request before its error is returned
+            backoff: Base delay of the first retry in seconds
+            max_backoff: Upper bound of a retry delay in seconds
+            timeout: Default (connect, read) timeout of requests sent without one
+            pool_size: Connections kept open per host
+            idempotent_paths: URL paths of non-idempotent methods that are safe
+                to retry anyway, e.g. YTMUSIC_READ_PATHS
+        """
+        self.bucket = bucket
+        self.idempotent_paths = tuple(idempotent_paths)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        super().__init__(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _retry_after(self, response: requests.Response) -> Optional[float]:
+        """Delay requested by a Retry-After header (seconds or HTTP date)"""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                delay = email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return None
+        return min(self.max_backoff, max(0.0, delay))
+
+    def _idempotent(self, request) -> bool:
+        if request.method in IDEMPOTENT_METHODS:
+            return True
+        return bool(self.idempotent_paths) and urlsplit(request.url).path.endswith(self.idempotent_paths)
+
+    @staticmethod
+    def _not_sent(error: Exception) -> bool:
+        """Whether a request failed before a connection to the server was established"""
+        if isinstance(error, requests.ConnectTimeout):
+            return True
+        # Connection failures are wrapped in a MaxRetryError holding the cause
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        return isinstance(reason, ConnectTimeoutError)
+
+    def send(self, request, **kwargs) -> requests.Response:
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        idempotent = self._idempotent(request)
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            try:
+                response = super().send(request, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.retries or not (idempotent or self._not_sent(e)):
+                    raise
+                delay = self._backoff(attempt)
+                logger.debug(f"{request.method} {request.url} failed ({e}), retrying in {delay:.1f}s")
+            else:
+                retryable = response.status_code == THROTTLED or (
+                    idempotent and response.status_code in RETRY_STATUSES
+                )
+                if not retryable or attempt >= self.retries:
+                    return response
+                retry_after = self._retry_after(response)
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+                if response.status_code == THROTTLED or retry_after is not None:
+                    self.bucket.pause(delay)
+                logger.debug(f"{request.method} {request.url} got {response.status_code}, retrying in {delay:.1f}s")
+                response.close()
+            attempt += 1
+            time.sleep(delay)
+
+
+class Transport:
+    """
+    HTTP transport shared by every client of one service.
+
+    All sessions handed out by a transport share a single adapter, i.e. one
+    connection pool and one rate limiter, however many worker threads use them.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        retries: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 60.0,
+        timeout: Optional[Timeout] = (5.0, 30.0),
+        pool_size: int = 10,
+        proxy: Optional[str] = None,
+        idempotent_paths: Iterable[str] = (),
+    ):
+        """
+        Args:
+            name: Service name, used in logs
+            rate: Requests per second, None for no limit
+            burst: Requests that can be sent at once (default: one second worth)
+            retries: Retries of a throttled or failed request
+            backoff: Base delay of the first retry in seconds
+            max_backoff: Upper bound of a retry delay in seconds
+            timeout: Default (connect, read) timeout in seconds
+            pool_size: Connections kept open per host, at least the number of workers
+            proxy: Proxy URL for every request, e.g. socks5://127.0.0.1:1080
+            idempotent_paths: URL paths of POST requests that are safe to retry
+                after a server error, e.g. YTMUSIC_READ_PATHS
+        """
+        self.name = name
+        self.timeout = timeout
+        self.proxy = proxy
+        self.bucket = TokenBucket(rate, burst)
+        self.adapter = RateLimitedAdapter(
+            self.bucket,
+            retries=retries,
+            backoff=backoff,
+            max_backoff=max_backoff,
+            timeout=timeout,
+            pool_size=pool_size,
+            idempotent_paths=idempotent_paths,
+        )
+
+    def session(self) -> requests.Session:
+        """New session sending its requests through the shared adapter"""
+        session = requests.Session()
+        session.mount("https://", self.adapter)
+        session.mount("http://", self.adapter)
+        if self.proxy:
+            session.proxies = {"http": self.proxy, "https": self.proxy}
+        session.trust_env = False
+        return session
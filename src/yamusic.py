@@ -1,89 +1,485 @@
+import hashlib
 import os
+import requests
+import sys
+import time
 import yaml
-from yandex_music import Client, Artist, Playlist
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from itertools import islice
+from yandex_music import Client, Artist, Playlist, Status, TrackShort
+from yandex_music import Track as YaTrack
 from yandex_music.utils.difference import Difference
-from typing import List, Set
+from yandex_music.utils.request import Request
+from yandex_music.exceptions import NetworkError, TimedOutError
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
-from .track import Track
+from .track import Track, TrackRecord
+from .store import ContentStore
+from .routing import ArtistIndex
+from .mirror import LibraryMirror, MINUTE
+from .transport import Transport
+from .metrics import Metrics
+from .likes import LikesDelta, diff_ids
 from tqdm import tqdm
 
 
+class TransportRequest(Request):
+    """
+    yandex_music Request sending every call through a shared Transport,
+    so the client reuses pooled connections and is rate limited and retried
+    like the YouTube Music client, instead of opening a connection per call.
+    """
+
+    def __init__(self, transport: Transport, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.transport = transport
+        self._session = transport.session()
+        if transport.timeout is not None:
+            self.set_timeout(transport.timeout)
+
+    def _request_wrapper(self, *args: Any, **kwargs: Any) -> bytes:
+        kwargs = self._prepare_kwargs(kwargs)
+        try:
+            resp = self._session.request(*args, **kwargs)
+        except requests.Timeout as e:
+            raise TimedOutError from e
+        except requests.RequestException as e:
+            raise NetworkError(e) from e
+
+        if not 200 <= resp.status_code < 300:
+            self._handle_error_response(resp.status_code, resp.content)
+
+        return resp.content
+
+
 class YaMusicHandle:
-    def __init__(self, token: str):
-        self.client = Client(token).init()
+    def __init__(
+        self,
+        token: str,
+        chunk_size: int = 100,
+        max_workers: int = 4,
+        download_workers: int = 4,
+        store: Optional[ContentStore] = None,
+        mirror: Optional[LibraryMirror] = None,
+        transport: Optional[Transport] = None,
+        account_ttl: float = 10 * MINUTE,
+        metrics: Optional[Metrics] = None,
+    ):
+        """
+        The API client is created on first use, so constructing the handle
+        costs no request.
+
+        Args:
+            account_ttl: Seconds the account status fetched on init is reused
+                from the library mirror instead of being requested again
+            metrics: Optional metrics recording every API call and download
+        """
+        self.token = token
+        self.account_ttl = account_ttl
+        self.transport = transport or Transport("yamusic", pool_size=max(10, max_workers, download_workers))
+        self._client: Optional[Client] = None
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.download_workers = download_workers
+        self.store = store
+        self.mirror = mirror
+        self.metrics = metrics
+        # Committed likes per consumer when there is no mirror: (revision, track ids)
+        self._likes_seen: Dict[str, Tuple[Optional[int], List[str]]] = {}
+        # Playlist listing and liked tracks while the library is pinned, None otherwise
+        self._memo: Optional[Dict[str, Any]] = None
 
-    def export_liked_tracks(self) -> List[Track]:
-        tracks = self.client.users_likes_tracks().tracks
+    @property
+    def client(self) -> Client:
+        if self._client is None:
+            self._client = self._init_client()
+        return self._client
+
+    def _init_client(self) -> Client:
+        """
+        Create the API client, restoring the account status from the library
+        mirror while it is younger than account_ttl instead of calling init().
+        """
+        client = Client(self.token, request=TransportRequest(self.transport))
+        if self.metrics is not None:
+            self.metrics.instrument(client, "yamusic")
+        # Entries are bound to the token without storing it
+        fingerprint = hashlib.sha256(self.token.encode("utf-8")).hexdigest()[:16]
+
+        entry = self.mirror.get("ya", "account") if self.mirror is not None else None
+        if entry is not None and entry.version == fingerprint and time.time() - entry.fetched_at <= self.account_ttl:
+            client.me = Status.de_json(entry.data, client)
+            if client.me is not None and client.me.account is not None:
+                client.account_uid = client.me.account.uid
+            return client
+
+        client.init()
+        if self.mirror is not None and client.me is not None:
+            self.mirror.put("ya", "account", "", fingerprint, client.me.to_dict())
+        return client
+
+    def _fetch_track_chunk(self, chunk: List[TrackShort]) -> List[Union[YaTrack, Exception]]:
+        """
+        Resolve a chunk of TrackShort objects with a single client.tracks() call.
+
+        Tracks the batch call could not resolve are fetched one by one, so a
+        single broken track only fails its own slot instead of the whole chunk.
+
+        Returns:
+            List aligned with the chunk, holding either a Track or the exception
+            raised while fetching it.
+        """
+        fetched = {}
+        try:
+            for track in self.client.tracks([track_short.track_id for track_short in chunk]):
+                fetched[str(track.id)] = track
+        except Exception:
+            fetched = {}
 
         result = []
+        for track_short in chunk:
+            track = fetched.get(str(track_short.id))
+            if track is None:
+                try:
+                    track = track_short.fetch_track()
+                except Exception as e:
+                    track = e
+            result.append(track)
+        return result
+
+    def _fetch_tracks(self, track_shorts: List[TrackShort]) -> List[Union[YaTrack, Exception]]:
+        """Resolve TrackShort objects chunk by chunk on the worker pool, keeping their order"""
+        chunks = [track_shorts[i:i + self.chunk_size] for i in range(0, len(track_shorts), self.chunk_size)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return [track for fetched in executor.map(self._fetch_track_chunk, chunks) for track in fetched]
+
+    def _iter_track_chunks(self, chunks: List[List[TrackShort]]) -> Iterator[List[Union[YaTrack, Exception]]]:
+        """
+        Resolve chunks on the worker pool and yield them in order.
+
+        At most two chunks per worker are in flight, so a slow consumer holds
+        back the requests instead of letting resolved tracks pile up.
+        """
+        window = 2 * self.max_workers
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            remaining = iter(chunks)
+            in_flight = deque(executor.submit(self._fetch_track_chunk, chunk) for chunk in islice(remaining, window))
+            while in_flight:
+                fetched = in_flight.popleft().result()
+                for chunk in islice(remaining, 1):
+                    in_flight.append(executor.submit(self._fetch_track_chunk, chunk))
+                yield fetched
+
+    def liked_track_shorts(self) -> List[TrackShort]:
+        """Liked tracks as returned by the likes listing, newest first and not yet resolved"""
+        return self.client.users_likes_tracks().tracks
+
+    def iter_liked_tracks(
+        self,
+        tracks: Optional[List[TrackShort]] = None,
+        reverse: bool = False,
+        progress: bool = True,
+    ) -> Iterator[Track]:
+        """
+        Export liked tracks as Track tuples while they are being resolved.
+
+        Tracks are resolved in concurrent chunks and yielded in likes order as
+        soon as their chunk is done, so a consumer can start before the whole
+        library is exported.
+
+        Args:
+            tracks: TrackShort objects to export instead of all liked tracks
+            reverse: Export oldest first. Chunks are resolved in that order too,
+                instead of reversing the list once everything is exported.
+            progress: Show the export progress bars
+        """
+        if tracks is None:
+            tracks = self.liked_track_shorts()
+        if reverse:
+            tracks = tracks[::-1]
+        chunks = [tracks[i:i + self.chunk_size] for i in range(0, len(tracks), self.chunk_size)]
+
+        exported = 0
         skipped_count = 0
         
-        with tqdm(total=len(tracks), position=0, desc='Export tracks') as pbar:
-            with tqdm(total=0, bar_format='{desc}', position=1) as trank_log:
-                for i, track_short in enumerate(tracks):
-                    try:
-                        track = track_short.fetch_track()
-                        
-                        # Safely handle the case where there are no artists
-                        if track.artists_name():
-                            artist = track.artists_name()[0]
-                        else:
-                            artist = "Unknown Artist"
-                        name = track.title
-                        
-                        result.append(Track(artist, name))
-                        pbar.update(1)
-                        trank_log.set_description_str(f'{i+1}/{len(tracks)}: {artist} - {name}')
-                        
-                    except TypeError as e:
-                        # Skip tracks with the "missing id" error
-                        if "missing 1 required positional argument: 'id'" in str(e):
-                            skipped_count += 1
+        with tqdm(total=len(tracks), position=0, desc='Export tracks', disable=not progress) as pbar:
+            with tqdm(total=0, bar_format='{desc}', position=1, disable=not progress) as trank_log:
+                i = -1
+                for fetched in self._iter_track_chunks(chunks):
+                    for track in fetched:
+                        i += 1
+                        try:
+                            if isinstance(track, Exception):
+                                raise track
+
+                            # Safely handle the case where there are no artists
+                            if track.artists_name():
+                                artist = sys.intern(track.artists_name()[0])
+                            else:
+                                artist = "Unknown Artist"
+                            name = track.title
+                            duration = track.duration_ms // 1000 if track.duration_ms else None
+                            
                             pbar.update(1)
-                            pbar.write(f"Skipped track {i+1}: Missing artist ID")
-                        else:
-                            # Re-raise other TypeErrors
-                            raise e
+                            trank_log.set_description_str(f'{i+1}/{len(tracks)}: {artist} - {name}')
                             
-                    except Exception as e:
-                        # Skip tracks with any other errors
-                        skipped_count += 1
-                        pbar.update(1)
-                        pbar.write(f"Skipped track {i+1}: {type(e).__name__}: {str(e)[:50]}...")
+                        except TypeError as e:
+                            # Skip tracks with the "missing id" error
+                            if "missing 1 required positional argument: 'id'" in str(e):
+                                skipped_count += 1
+                                pbar.update(1)
+                                tqdm.write(f"Skipped track {i+1}: Missing artist ID")
+                                continue
+                            else:
+                                # Re-raise other TypeErrors
+                                raise e
+                                
+                        except Exception as e:
+                            # Skip tracks with any other errors
+                            skipped_count += 1
+                            pbar.update(1)
+                            tqdm.write(f"Skipped track {i+1}: {type(e).__name__}: {str(e)[:50]}...")
+                            continue
+
+                        exported += 1
+                        yield Track(artist, name, str(track.id), duration)
         
-        print(f"\nSuccessfully exported {len(result)} tracks")
+        print(f"\nSuccessfully exported {exported} tracks")
         if skipped_count > 0:
             print(f"Skipped {skipped_count} tracks due to errors")
-        
-        return result
 
-    def get_playlists(self) -> List[Playlist]:
+    def export_liked_tracks(self, tracks: Optional[List[TrackShort]] = None) -> List[Track]:
+        """
+        Export liked tracks as Track tuples, resolving them in concurrent chunks.
+
+        Args:
+            tracks: TrackShort objects to export instead of all liked tracks
+        """
+        return list(self.iter_liked_tracks(tracks))
+
+    @contextmanager
+    def pinned_library(self):
+        """
+        Reuse the playlist listing and the liked tracks for the duration of the block.
+
+        Inside the block each of them is fetched once and served to every later
+        call until one of our own writes invalidates it, so scripted steps
+        share what the previous ones fetched.
+        """
+        self._memo = {}
+        try:
+            yield self
+        finally:
+            self._memo = None
+
+    def _remember(self, key: str, value: Any) -> Any:
+        """Keep a fetched value while the library is pinned"""
+        if self._memo is not None:
+            self._memo[key] = value
+        return value
+
+    def get_playlists(self, refresh: bool = False) -> List[Playlist]:
+        """
+        Playlists of the user with their revisions.
+
+        A listing in the library mirror is served as long as it is fresh, a
+        listing fetched inside pinned_library() as long as the block lasts.
+
+        Args:
+            refresh: Fetch the listing even if the mirror holds a fresh one
+        """
+        if self._memo is not None and not refresh and "playlists" in self._memo:
+            return self._memo["playlists"]
+        if self.mirror is not None and not refresh:
+            entry = self.mirror.get("ya", "playlists")
+            if self.mirror.is_fresh(entry):
+                playlists = [Playlist.de_json(data, self.client) for data in entry.data]  # type: ignore
+                return self._remember("playlists", playlists)
         try:
             playlists = self.client.users_playlists_list()
-            return playlists
         except Exception as e:
             print(f"Error getting library playlists: {e}")
             return []
+        if self.mirror is not None:
+            self.mirror.put("ya", "playlists", "", None, [playlist.to_dict() for playlist in playlists])
+        return self._remember("playlists", playlists)
+
+    def _load_records(self, rows: List[Any], model: Any) -> List[TrackRecord]:
+        """
+        TrackRecords stored in the library mirror. Rows stored before tracks
+        were kept as records are model dicts and are projected on load.
+        """
+        return [
+            TrackRecord.from_yamusic(model.de_json(row, self.client)) if isinstance(row, dict) else TrackRecord.from_row(row)
+            for row in rows
+        ]
+
+    def get_playlist_tracks(self, playlist: Playlist) -> List[TrackRecord]:
+        """
+        Tracks of a playlist as TrackRecords, served from the library mirror
+        while the playlist revision matches the one they were fetched at.
+        """
+        key = str(playlist.kind)
+        if self.mirror is not None:
+            entry = self.mirror.get("ya", "playlist", key)
+            if entry is not None and entry.version == str(playlist.revision):
+                return self._load_records(entry.data, TrackShort)  # type: ignore
+        tracks = [TrackRecord.from_yamusic(track) for track in playlist.fetch_tracks()]
+        if self.mirror is not None:
+            self.mirror.put("ya", "playlist", key, playlist.revision, tracks)
+        return tracks
+
+    def get_liked_tracks(self, refresh: bool = False) -> List[TrackRecord]:
+        """
+        Liked tracks as TrackRecords.
+
+        The mirror is served as long as it is fresh. After that the likes are
+        requested only if modified since the mirrored revision, and when they
+        did change only tracks the mirror doesn't hold yet are fetched.
+
+        Args:
+            refresh: Check the likes revision even if the mirror is fresh
+        """
+        if self._memo is not None and not refresh and "likes" in self._memo:
+            return self._memo["likes"]
+        return self._remember("likes", self._fetch_liked_tracks(refresh))
+
+    def _fetch_liked_tracks(self, refresh: bool) -> List[TrackRecord]:
+        entry = self.mirror.get("ya", "likes") if self.mirror is not None else None
+        if entry is not None and not refresh and self.mirror.is_fresh(entry):
+            return self._load_records(entry.data, YaTrack)  # type: ignore
+
+        trackslist = self.client.users_likes_tracks(
+            if_modified_since_revision=int(entry.version) if entry is not None and entry.version else 0
+        )
+        if entry is not None and (not trackslist or entry.version == str(trackslist.revision)):
+            self.mirror.touch("ya", "likes")
+            return self._load_records(entry.data, YaTrack)  # type: ignore
+        if not trackslist:
+            return []
+
+        known = {record.id: record for record in self._load_records(entry.data, YaTrack)} if entry is not None else {}  # type: ignore
+        missing = [track_short for track_short in trackslist.tracks if str(track_short.id) not in known]
+        known.update(
+            (str(track.id), TrackRecord.from_yamusic(track))
+            for track in self._fetch_tracks(missing)
+            if not isinstance(track, Exception)
+        )
+        tracks = [known[str(track_short.id)] for track_short in trackslist.tracks if str(track_short.id) in known]
+        if self.mirror is not None:
+            self.mirror.put("ya", "likes", "", trackslist.revision, tracks)
+        return tracks
+
+    def _get_likes_seen(self, consumer: str) -> Tuple[Optional[int], List[str]]:
+        """Revision and track ids of the likes a consumer last committed"""
+        if self.mirror is None:
+            return self._likes_seen.get(consumer, (None, []))
+        entry = self.mirror.get("ya", "likes_seen", consumer)
+        if entry is None:
+            return None, []
+        return (int(entry.version) if entry.version else None), entry.data
+
+    def liked_tracks_delta(self, consumer: str = "transfer") -> LikesDelta:
+        """
+        Liked tracks added and removed since the consumer last committed.
+
+        The likes are requested only if modified since the committed revision,
+        so an unchanged library costs one call. Otherwise the id list is diffed
+        against the committed ids and only the added tracks are fetched. The
+        first delta of a consumer holds every liked track.
+
+        Args:
+            consumer: Name the seen likes are remembered under, e.g. the command
+                consuming the delta
+
+        Returns:
+            LikesDelta to be handed to commit_likes_delta() once it is handled
+        """
+        revision, seen = self._get_likes_seen(consumer)
+        trackslist = self.client.users_likes_tracks(if_modified_since_revision=revision or 0)
+        if not trackslist or (revision is not None and trackslist.revision == revision):
+            return LikesDelta(consumer, revision, [], [], [], seen)
+
+        track_ids = [str(track_short.id) for track_short in trackslist.tracks]
+        added_ids, removed = diff_ids(seen, track_ids)
+        added_set = set(added_ids)
+        added_shorts = [track_short for track_short in trackslist.tracks if str(track_short.id) in added_set]
+        print(f"Likes changed since revision {revision}: {len(added_ids)} added, {len(removed)} removed")
+        added = self.export_liked_tracks(added_shorts) if added_shorts else []
+        return LikesDelta(consumer, trackslist.revision, added, added_ids, removed, track_ids)
+
+    def commit_likes_delta(self, delta: LikesDelta, exclude: Iterable[str] = ()) -> None:
+        """
+        Remember the likes of a handled delta as seen by its consumer.
+
+        Args:
+            delta: Delta returned by liked_tracks_delta()
+            exclude: Track ids to leave unseen, so they show up as added again
+                in the next delta (e.g. tracks that failed)
+        """
+        exclude = set(exclude)
+        track_ids = [track_id for track_id in delta.track_ids if track_id not in exclude]
+        # Without a revision the next delta lists the likes again even if unchanged,
+        # which is what brings excluded tracks back
+        revision = None if len(track_ids) < len(delta.track_ids) else delta.revision
+        if self.mirror is None:
+            self._likes_seen[delta.consumer] = (revision, track_ids)
+        else:
+            self.mirror.put("ya", "likes_seen", delta.consumer, revision, track_ids)
+
+    def _invalidate_playlists(self) -> None:
+        """Forget the playlist listing after a write, so new revisions are picked up"""
+        if self._memo is not None:
+            self._memo.pop("playlists", None)
+        if self.mirror is not None:
+            self.mirror.invalidate("ya", "playlists")
+
+    def _invalidate_likes(self) -> None:
+        """Forget the liked tracks after removing some of them"""
+        if self._memo is not None:
+            self._memo.pop("likes", None)
+        if self.mirror is not None:
+            self.mirror.invalidate("ya", "likes")
+
+    def refresh_mirror(self) -> None:
+        """
+        Bring the library mirror up to date.
+
+        The playlist listing and the likes revision are fetched again, tracks
+        are only refetched for playlists whose revision changed.
+        """
+        if self.mirror is None:
+            print("Library mirror is disabled")
+            return
+        playlists = self.get_playlists(refresh=True)
+        for playlist in tqdm(playlists, desc="Refreshing playlists"):
+            try:
+                self.get_playlist_tracks(playlist)
+            except Exception as e:
+                print(f"  Error refreshing playlist {playlist.title}: {e}")
+        liked_tracks = self.get_liked_tracks(refresh=True)
+        print(f"Library mirror refreshed: {len(playlists)} playlists, {len(liked_tracks)} liked tracks")
         
     def get_playlist_artists(self, playlist: Playlist) -> Set[str]:
         artists = set()
         try:
-            tracks = playlist.fetch_tracks()
+            tracks = self.get_playlist_tracks(playlist)
             for track in tracks:
-                for artist in track.track.artists:
-                    artists.add(artist.name)
+                artists.update(track.artists)
         except:
             artists = set()
         return artists
         
     def print_playlists(self):
-        playlists = self.client.users_playlists_list()
+        playlists = self.get_playlists()
         for playlist in playlists:
             print (f"{playlist.title}: {playlist.kind}")
 
     def playlist_map(self, output_file: str = "temp_playlist_map.yaml"):
         print("Fetching playlists...")
-        playlists = self.client.users_playlists_list()
+        playlists = self.get_playlists()
         
         if not playlists:
             print("No playlists found.")
@@ -111,6 +507,7 @@ class YaMusicHandle:
 
     def create_playlist(self):
         playlist = self.client.users_playlists_create("Test")
+        self._invalidate_playlists()
         print(f'{playlist.title}: {playlist.kind}')
         return playlist.kind
 
@@ -127,72 +524,219 @@ class YaMusicHandle:
         diff = Difference()
         diff.add_insert(0, tracks)
         self.client.users_playlists_change(playlist.kind, diff.to_json(), playlist.revision)
+        self._invalidate_playlists()
 
     def delete_tracks_from_playlist(self, kind):
         playlist = self.client.users_playlists(kind)
         diff = Difference()
         diff.add_delete(0, playlist.track_count)
         self.client.users_playlists_change(playlist.kind, diff.to_json(), playlist.revision)
+        self._invalidate_playlists()
 
     def delete_playlist(self, kind):
         self.client.users_playlists_delete(kind)
+        self._invalidate_playlists()
 
 
-    def download_tracks(self, tracks, name):
+    def _download_track(self, track: TrackRecord, filename: str) -> None:
+        """
+        Download a track with a single download-info lookup.
+
+        The mp3 variant with the highest bitrate is downloaded straight from its
+        DownloadInfo instead of letting track.download() resolve it again. With
+        a content store the file is fetched once per track id and linked here.
+        """
+        def download(folder: str) -> str:
+            download_infos = [info for info in self.client.tracks_download_info(track.track_id) if info.codec == 'mp3']
+            if not download_infos:
+                raise ValueError("No mp3 download available")
+            best = max(download_infos, key=lambda info: info.bitrate_in_kbps)
+            path = os.path.join(folder, os.path.basename(filename))
+            if self.metrics is None:
+                best.download(path)
+                return path
+            with self.metrics.track("yamusic", "download"):
+                best.download(path)
+            self.metrics.add_bytes("yamusic", "download", os.path.getsize(path))
+            return path
+
+        if self.store is None:
+            download(os.path.dirname(filename))
+            return
+
+        stored = self.store.fetch("ya", track.id, download)
+        if stored is None:
+            raise ValueError("Download failed")
+        self.store.link(stored, filename)
+
+    def download_tracks(self, tracks: List[TrackRecord], name, workers: Optional[int] = None):
         chars_to_remove = ['/', '"', ':', "?", "*", "¿"]
         folder = f"downloads/{name}"
         os.makedirs(folder, exist_ok=True)
-        existed_tracks = [f"{folder}/{f}" for f in os.listdir(folder)]
-        for track in tqdm(tracks, desc="Downloading tracks"):
+        existed_tracks = {f"{folder}/{f}" for f in os.listdir(folder)}
+
+        to_download = []
+        for track in tracks:
             try:
-                title = track["title"]
+                title = track.title
                 for char in chars_to_remove:
                     title = title.replace(char, "")
 
-                if track["artists"] and len(track["artists"]) > 0:
-                    artist = track["artists"][0]["name"]
+                if track.artists:
+                    artist = track.artist
                     for char in chars_to_remove:
                         artist = artist.replace(char, "")
                     filename = f"{folder}/{artist} - {title}.mp3"
                 else:
                     filename = f"{folder}/{title}.mp3"
-                if filename not in existed_tracks: 
-                    download_infos = track.get_download_info()
-                    bitrate = 192
-                    for download_info in download_infos:
-                        bitrate = max(download_info["bitrate_in_kbps"], bitrate)
-                    track.download(filename, 'mp3', bitrate)
+                if filename not in existed_tracks:
+                    # Reserve the name so a duplicate in the same list isn't fetched twice
+                    existed_tracks.add(filename)
+                    to_download.append((track, filename))
             except Exception as e:
                 print(f"  Skipping track: {e}")
                 continue
+
+        print(f"{len(tracks) - len(to_download)} tracks already in {folder}, downloading {len(to_download)}")
+        if not to_download:
+            return
+
+        with ThreadPoolExecutor(max_workers=workers or self.download_workers) as executor:
+            futures = {
+                executor.submit(self._download_track, track, filename): filename
+                for track, filename in to_download
+            }
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Downloading tracks"):
+                try:
+                    future.result()
+                except Exception as e:
+                    tqdm.write(f"  Skipping track {futures[future]}: {e}")
                 
 
-    def download_playist(self, playlist: Playlist):
-        short_tracks = playlist.fetch_tracks()
-        print(f"Get {len(short_tracks)} tracks from playlist {playlist["title"]}")
-        track_ids = [track["id"] for track in short_tracks]
-        tracks = self.client.tracks(track_ids)
-        self.download_tracks(tracks, playlist["title"])
+    def download_playist(self, playlist: Playlist, workers: Optional[int] = None):
+        tracks = self.get_playlist_tracks(playlist)
+        print(f"Get {len(tracks)} tracks from playlist {playlist["title"]}")
+        # Only tracks listed without their track data need a lookup
+        missing = [track.track_id for track in tracks if not track.title]
+        if missing:
+            resolved = {str(track.id): TrackRecord.from_yamusic(track) for track in self.client.tracks(missing)}
+            tracks = [track if track.title else resolved.get(track.id, track) for track in tracks]
+        self.download_tracks(tracks, playlist["title"], workers)
 
-    def download_playlists(self):
+    def download_playlists(self, workers: Optional[int] = None):
         playlists = self.get_playlists()
         for playlist in playlists:
-            self.download_playist(playlist)
+            self.download_playist(playlist, workers)
 
-    def download_like_tracks(self):
-        trackslist = self.client.users_likes_tracks()
-        if trackslist:
-            tracks = trackslist.fetch_tracks()
-            self.download_tracks(tracks, "Like")
+    def download_like_tracks(self, workers: Optional[int] = None):
+        tracks = self.get_liked_tracks()
+        if tracks:
+            self.download_tracks(tracks, "Like", workers)
+
+
+    @staticmethod
+    def _playlist_diff(
+        current: List[str], desired: List[Dict[str, Any]]
+    ) -> Tuple[List[Tuple[int, int]], List[Dict[str, Any]]]:
+        """
+        Minimal changes turning a playlist's tracks into the desired track set.
+
+        Tracks present in both keep their position. Tracks that are not desired
+        (and repeated entries) are deleted, missing tracks are appended.
+
+        Args:
+            current: Track ids currently in the playlist, in playlist order
+            desired: {'id', 'album_id'} dicts of the tracks the playlist should hold
+
+        Returns:
+            Tuple of (delete ranges as [from, to) in descending order, tracks to append)
+        """
+        desired_ids = {track['id'] for track in desired}
+        kept = set()
+        deleted = []
+        for i, track_id in enumerate(current):
+            if track_id in desired_ids and track_id not in kept:
+                kept.add(track_id)
+            else:
+                deleted.append(i)
+
+        ranges: List[Tuple[int, int]] = []
+        for i in deleted:
+            if ranges and ranges[-1][1] == i:
+                ranges[-1] = (ranges[-1][0], i + 1)
+            else:
+                ranges.append((i, i + 1))
+        ranges.reverse()
+
+        inserts = []
+        for track in desired:
+            if track['id'] not in kept:
+                kept.add(track['id'])
+                inserts.append(track)
+        return ranges, inserts
 
+    def sync_playlist_tracks(self, kind, tracks: List[Dict[str, Any]], batch_size: int = 50) -> Tuple[int, int]:
+        """
+        Bring a playlist to the desired track set with a minimal Difference.
+
+        The playlist is read once. The revision returned by each
+        users_playlists_change call is carried into the next one instead of
+        reading the playlist again, so an unchanged playlist costs one read and
+        no writes.
+
+        Args:
+            kind: Playlist kind
+            tracks: {'id', 'album_id'} dicts of the tracks the playlist should hold
+            batch_size: Maximum number of tracks inserted per change call
 
-    def sync_playlists_from_yaml(self, yaml_file: str = "yamusic.yaml"):
+        Returns:
+            Tuple of (deleted_count, inserted_count)
         """
-        Read playlist configuration from YAML file, clear existing playlists,
-        and populate them with liked tracks based on artist matching.
+        playlist = self.client.users_playlists(kind)
+        current_tracks = playlist.tracks
+        if not current_tracks and playlist.track_count:
+            current_tracks = playlist.fetch_tracks()
+        current = [str(track.id) for track in current_tracks or []]
+
+        ranges, inserts = self._playlist_diff(current, tracks)
+        deleted = sum(end - start for start, end in ranges)
+        if not ranges and not inserts:
+            print(f"  Playlist is up to date ({len(current)} tracks)")
+            return 0, 0
+
+        print(f"  Deleting {deleted} and adding {len(inserts)} tracks")
+        revision = playlist.revision
+        position = len(current) - deleted
+
+        diff = Difference()
+        for start, end in ranges:
+            diff.add_delete(start, end)
+
+        inserted = 0
+        batches = [inserts[i:i + batch_size] for i in range(0, len(inserts), batch_size)] or [[]]
+        for batch in batches:
+            if batch:
+                diff.add_insert(position, batch)
+            result = self.client.users_playlists_change(kind, diff.to_json(), revision)
+            revision = result.revision
+            position += len(batch)
+            inserted += len(batch)
+            if batch:
+                print(f"    Added batch of {len(batch)} tracks (total: {inserted})")
+            diff = Difference()
+
+        return deleted, inserted
+
+    def sync_playlists_from_yaml(self, yaml_file: str = "yamusic.yaml", incremental: bool = True):
+        """
+        Read playlist configuration from YAML file and populate the playlists
+        with liked tracks based on artist matching.
         
         Args:
             yaml_file: Path to the YAML configuration file
+            incremental: Apply only the difference between each playlist and its
+                desired tracks. If False, clear every playlist and insert all
+                tracks again.
         """
         # Read YAML file
         print(f"Reading playlist configuration from {yaml_file}")
@@ -201,38 +745,44 @@ class YaMusicHandle:
         
         # Get all user playlists
         print("Fetching existing playlists...")
-        existing_playlists = {p.title: p for p in self.client.users_playlists_list()}
+        existing_playlists = {p.title: p for p in self.get_playlists()}
         
         # Get all liked tracks
         print("Fetching liked tracks...")
-        trackslist = self.client.users_likes_tracks()
-        liked_tracks = trackslist.fetch_tracks()
+        liked_tracks = self.get_liked_tracks()
 
         print(f"Found {len(liked_tracks)} liked tracks")
-        
-        # Process each playlist from YAML
-        for playlist_name, config in tqdm(playlists_config.items(), desc="Processing playlists"):
-            kind = config.get('kind')
-            artists = set(config.get('artists', []))
-            
-            # Check if playlist exists and create if needed
-            if not kind or playlist_name not in existing_playlists:
+
+        # Create all missing playlists up front
+        created = False
+        for playlist_name, config in playlists_config.items():
+            if not config.get('kind') or playlist_name not in existing_playlists:
                 print(f"\nPlaylist '{playlist_name}' not found or missing kind, creating...")
                 try:
                     # Create new playlist
                     new_playlist = self.client.users_playlists_create(playlist_name)
-                    kind = new_playlist.kind
-                    print(f"  Created playlist with kind: {kind}")
+                    print(f"  Created playlist with kind: {new_playlist.kind}")
                     
                     # Update the config in memory (optional, doesn't save to file)
-                    config['kind'] = kind
-                    
-                    # Refresh existing playlists dictionary
-                    existing_playlists = {p.title: p for p in self.client.users_playlists_list()}
+                    config['kind'] = new_playlist.kind
+                    created = True
                 except Exception as e:
                     print(f"  Failed to create playlist '{playlist_name}': {e}")
-                    continue
-            
+
+        # Refresh existing playlists dictionary once
+        if created:
+            existing_playlists = {p.title: p for p in self.get_playlists(refresh=True)}
+
+        # Route every liked track to its playlists in a single pass
+        index = ArtistIndex(playlists_config)
+        buckets = index.route(
+            liked_tracks,
+            lambda track: track.artists,
+            any_artist=True,
+        )
+        
+        # Process each playlist from YAML
+        for playlist_name, config in tqdm(playlists_config.items(), desc="Processing playlists"):
             # Get the playlist to ensure we have valid kind
             if playlist_name in existing_playlists:
                 playlist = existing_playlists[playlist_name]
@@ -243,6 +793,19 @@ class YaMusicHandle:
             
             print(f"\nProcessing playlist: {playlist_name} (kind: {kind})")
             
+            # Tracks routed to this playlist by any of their artists
+            tracks_to_add = [
+                {'id': track.id, 'album_id': track.album_id}
+                for track in buckets.get(playlist_name, [])
+            ]
+
+            if incremental:
+                try:
+                    self.sync_playlist_tracks(kind, tracks_to_add)
+                except Exception as e:
+                    print(f"  Error syncing playlist: {e}")
+                continue
+
             # Clear the playlist
             print(f"  Clearing playlist...")
             try:
@@ -250,25 +813,6 @@ class YaMusicHandle:
             except Exception as e:
                 print(f"  Warning: Could not clear playlist: {e}")
             
-            # Find tracks by artists from this playlist
-            tracks_to_add = []
-            for track in tqdm(liked_tracks, desc=f"  Finding tracks for {playlist_name}", leave=False):
-                track_artists = set()
-                for artist in track.artists:
-                    track_artists.add(artist.name)
-                
-                # Check if any artist from this track matches the playlist's artists
-                if track_artists & artists:  # Intersection of sets
-                    # Get album_id safely
-                    album_id = None
-                    if track.albums and len(track.albums) > 0:
-                        album_id = str(track.albums[0].id)
-                    
-                    tracks_to_add.append({
-                        'id': str(track.id),
-                        'album_id': album_id
-                    })
-            
             # Add tracks to playlist if any found
             if tracks_to_add:
                 print(f"  Found {len(tracks_to_add)} tracks to add")
@@ -300,10 +844,37 @@ class YaMusicHandle:
                         continue
             else:
                 print(f"  No matching tracks found for playlist '{playlist_name}'")
-        
+
+        self._invalidate_playlists()
         print("\nSync completed!")
 
-    def check_tracks(self):
+    def check_tracks(self, incremental: bool = False):
+        """
+        Remove liked tracks that can no longer be fetched.
+
+        Args:
+            incremental: Check only tracks liked since the last incremental
+                check. Resolving the delta is the check: added tracks that
+                could not be fetched are the broken ones.
+        """
+        if incremental:
+            delta = self.liked_tracks_delta("check")
+            fetched = {track.id for track in delta.added}
+            broken = [track_id for track_id in delta.added_ids if track_id not in fetched]
+            print(f"Checked {len(delta.added_ids)} tracks liked since the last check")
+            removed = []
+            for track_id in broken:
+                try:
+                    self.client.users_likes_tracks_remove(track_id)
+                    removed.append(track_id)
+                    print(f"  Removed track {track_id} from like")
+                except Exception as e:
+                    print(f"  Failed to remove track {track_id} from like: {e}")
+            if removed:
+                self._invalidate_likes()
+            self.commit_likes_delta(delta, exclude=broken)
+            return
+
         trackslist = self.client.users_likes_tracks()
         for track_short in tqdm(trackslist.tracks, desc="Fetching liked tracks"):
             try:
@@ -311,5 +882,6 @@ class YaMusicHandle:
             except Exception as e:
                 print(f"  Removed track {track_short.track_id} from like")
                 self.client.users_likes_tracks_remove(track_short.track_id)
+                self._invalidate_likes()
                 print(f"  Skipping track: {e}")
-                continue
\ No newline at end of file
+                continue
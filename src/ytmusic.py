@@ -1,21 +1,31 @@
-import requests
 from tqdm import tqdm
 from ytmusicapi import YTMusic
-from typing import List, Dict, Any, Optional, Set, Union, Tuple
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Set, Union, Tuple
 import yaml
 from pathlib import Path
 import os
 import logging
-import yt_dlp
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime
 
-# Create logs directory if it doesn't exist
-logs_dir = Path("logs")
-logs_dir.mkdir(exist_ok=True)
+class _LogsFileHandler(logging.FileHandler):
+    """FileHandler creating the logs directory when the first record is written"""
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(exist_ok=True)
+        return super()._open()
+
 
-# Configure logging to write to log folder
+# Configure logging to write to log folder. The file is only created once
+# something is logged, so importing the module doesn't touch the disk.
+logs_dir = Path("logs")
 log_filename = logs_dir / f"download_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-file_handler = logging.FileHandler(log_filename)
+file_handler = _LogsFileHandler(log_filename, delay=True)
 file_handler.setLevel(logging.INFO)
 file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
 
@@ -34,93 +44,658 @@ file_logger.setLevel(logging.INFO)
 file_logger.addHandler(file_handler)
 file_logger.propagate = False  # Don't send to console
 
-from src.track import Track
+
+class _QuietLogger:
+    """
+    yt-dlp logger discarding its messages except errors, which go to the log file.
+
+    Passed per download instead of redirecting sys.stdout/sys.stderr, so
+    output of other threads (progress bars, summaries) is left alone.
+    """
+
+    def debug(self, msg: str) -> None:
+        pass
+
+    def info(self, msg: str) -> None:
+        pass
+
+    def warning(self, msg: str) -> None:
+        pass
+
+    def error(self, msg: str) -> None:
+        file_logger.error(msg)
+
+
+from src.track import Track, TrackRecord
+from src.cache import MatchCache
+from src.matching import MatchScorer
+from src.store import ContentStore
+from src.trackdb import TrackMapStore
+from src.mirror import LibraryMirror
+from src.transport import Transport, YTMUSIC_READ_PATHS
+from src.metrics import Metrics
+from src.routing import ArtistIndex
+from src.journal import TransferJournal, MATCHED, LIKED, ADDED, NOT_FOUND, ERROR
 
 
 class YTMusicClient:
     def __init__(
         self,
+        auth: str = "browser.json",
+        workers: int = 1,
+        cache: Optional[MatchCache] = None,
+        scorer: Optional[MatchScorer] = None,
+        store: Optional[ContentStore] = None,
+        mirror: Optional[LibraryMirror] = None,
+        transport: Optional[Transport] = None,
+        metrics: Optional[Metrics] = None,
     ):
-        session = requests.Session()
-        session.proxies = {
-            "http": "socks5://127.0.0.1:1080",
-            "https": "socks5://127.0.0.1:1080"
-        }
-        session.trust_env = False
+        self.auth = auth
+        self.workers = workers
+        self.cache = cache
+        self.scorer = scorer or MatchScorer()
+        self.store = store
+        self.mirror = mirror
+        self.transport = transport or Transport(
+            "ytmusic",
+            proxy="socks5://127.0.0.1:1080",
+            pool_size=max(10, workers),
+            idempotent_paths=YTMUSIC_READ_PATHS,
+        )
+        self.metrics = metrics
+        self.ytmusic = self._instrument(self._build_ytmusic())
+        self._local = threading.local()
+        # Session memo of full playlists: playlistId -> (track count, playlist)
+        self._playlist_memo: Dict[str, Tuple[Any, Dict[str, Any]]] = {}
+        self._memo_lock = threading.Lock()
+        # Library listings by limit while the library is pinned, None otherwise
+        self._listing_memo: Optional[Dict[str, List[Dict[str, Any]]]] = None
 
-        self.ytmusic = YTMusic(
-            auth="browser.json",
-            requests_session=session,
+    def _build_ytmusic(self) -> YTMusic:
+        """YTMusic instance with its own session on the shared transport"""
+        return YTMusic(
+            auth=self.auth,
+            requests_session=self.transport.session(),
         )
 
-    def import_liked_tracks(
-        self, tracks: List[Track]
-    ) -> Tuple[List[Track], List[Track]]:
-        not_found: List[Track] = []
-        errors: List[Track] = []
+    def _instrument(self, ytmusic: YTMusic) -> YTMusic:
+        """Record the calls of a YTMusic instance in the metrics"""
+        if self.metrics is not None:
+            self.metrics.instrument(ytmusic, "ytmusic", exclude=("as_mobile",))
+        return ytmusic
 
-        with tqdm(total=len(tracks), position=0, desc="Import tracks") as pbar:
-            with tqdm(total=0, bar_format="{desc}", position=1) as trank_log:
-                for track in tracks:
-                    query = f"{track.artist} {track.name}"
+    def _worker_ytmusic(self) -> YTMusic:
+        """YTMusic instance owned by the calling worker thread"""
+        ytmusic = getattr(self._local, "ytmusic", None)
+        if ytmusic is None:
+            ytmusic = self._instrument(self._build_ytmusic())
+            self._local.ytmusic = ytmusic
+        return ytmusic
 
-                    try:
-                        results = self.ytmusic.search(query, filter="songs")
-                    except Exception as e:
-                        errors.append(track)
-                        pbar.write(f"Search error: {query}, {e}")
-                        pbar.update(1)
-                        continue
+    def _match_track(
+        self, ytmusic: YTMusic, track: Track, limit: Optional[int] = None
+    ) -> Optional[str]:
+        """
+        Find the videoId matching a track, consulting the match cache first.
+
+        Returns:
+            videoId of the best result or None if nothing was found.
+            Search errors are raised and never cached.
+        """
+        if self.cache is not None:
+            entry = self.cache.get(track, self.scorer.version)
+            if entry is not None:
+                return entry.video_id
+
+        query = f"{track.artist} {track.name}"
+        if limit is None:
+            results = ytmusic.search(query, filter="songs")
+        else:
+            results = ytmusic.search(query, filter="songs", limit=limit)
+
+        video_id, confidence = None, None
+        if results:
+            best, confidence = self.scorer.best(track, results)
+            if best is None:
+                file_logger.info(
+                    f"No confident match for {track.artist} - {track.name} (best score {confidence:.2f})"
+                )
+            else:
+                video_id = best["videoId"]
+
+        if self.cache is not None:
+            self.cache.put(track, video_id, results or [], confidence, self.scorer.version)
+        return video_id
+
+    def _search_track(
+        self, ytmusic: YTMusic, track: Track, journal: Optional[TransferJournal] = None
+    ) -> Tuple[str, Optional[str], Optional[str]]:
+        """
+        Match a track without writing anything to the library.
 
-                    if not results:
-                        not_found.append(track)
+        Returns:
+            Tuple of (status, video_id, message) where status is "matched", "not_found" or "error"
+        """
+        try:
+            video_id = self._match_track(ytmusic, track)
+        except Exception as e:
+            if journal is not None:
+                journal.record(track, ERROR, error=str(e))
+            return ERROR, None, f"Search error: {track.artist} {track.name}, {e}"
+
+        if not video_id:
+            if journal is not None:
+                journal.record(track, NOT_FOUND)
+            return NOT_FOUND, None, None
+
+        if journal is not None:
+            journal.record(track, MATCHED, video_id=video_id)
+        return MATCHED, video_id, None
+
+    def _import_track(
+        self, ytmusic: YTMusic, track: Track, journal: Optional[TransferJournal] = None
+    ) -> Tuple[str, Optional[str], Optional[str]]:
+        """
+        Search a track and like the best result.
+
+        Args:
+            ytmusic: YTMusic instance to use
+            track: Track to import
+            journal: Optional journal receiving every outcome as soon as it is known
+
+        Returns:
+            Tuple of (status, video_id, message) where status is "liked", "not_found" or "error"
+        """
+        status, video_id, message = self._search_track(ytmusic, track, journal)
+        if status != MATCHED:
+            return status, video_id, message
+
+        try:
+            ytmusic.rate_song(video_id, "LIKE")  # type: ignore
+        except Exception as e:
+            if journal is not None:
+                journal.record(track, ERROR, video_id=video_id, error=str(e))
+            return ERROR, video_id, f"Error: {track.artist} - {track.name}, {e}"
+
+        if journal is not None:
+            journal.record(track, LIKED, video_id=video_id)
+        return LIKED, video_id, None
+
+    def _run_tracks(
+        self,
+        tracks: List[Track],
+        func: Callable[[YTMusic, Track], Tuple[str, Optional[str], Optional[str]]],
+        workers: Optional[int] = None,
+        desc: str = "Import tracks",
+    ) -> List[Tuple[str, Optional[str]]]:
+        """
+        Apply func(ytmusic, track) to every track with progress bars.
+
+        With more than one worker the calls run in a thread pool and each thread
+        uses its own YTMusic instance, since a shared one is not thread safe.
+
+        Returns:
+            List of (status, video_id) in input order
+        """
+        workers = workers or self.workers
+        results: List[Tuple[str, Optional[str]]] = [(ERROR, None)] * len(tracks)
+
+        with tqdm(total=len(tracks), position=0, desc=desc) as pbar:
+            with tqdm(total=0, bar_format="{desc}", position=1) as trank_log:
+                if workers > 1:
+                    with ThreadPoolExecutor(max_workers=workers) as executor:
+                        futures = {
+                            executor.submit(lambda t: func(self._worker_ytmusic(), t), track): i
+                            for i, track in enumerate(tracks)
+                        }
+                        for future in as_completed(futures):
+                            i = futures[future]
+                            status, video_id, message = future.result()
+                            results[i] = (status, video_id)
+                            if message:
+                                pbar.write(message)
+                            pbar.update(1)
+                            trank_log.set_description_str(f"{tracks[i].artist} - {tracks[i].name}")
+                else:
+                    for i, track in enumerate(tracks):
+                        status, video_id, message = func(self.ytmusic, track)
+                        results[i] = (status, video_id)
+                        if message:
+                            pbar.write(message)
                         pbar.update(1)
-                        continue
+                        trank_log.set_description_str(f"{track.artist} - {track.name}")
+
+        return results
+
+    def _iter_stream_tracks(
+        self,
+        tracks: Iterable[Track],
+        func: Callable[[YTMusic, Track], Tuple[str, Optional[str], Optional[str]]],
+        workers: Optional[int] = None,
+        queue_size: int = 100,
+        total: Optional[int] = None,
+        desc: str = "Import tracks",
+    ) -> Iterator[Tuple[Track, str, Optional[str]]]:
+        """
+        Apply func(ytmusic, track) to tracks while they are still being produced.
+
+        A producer thread pulls tracks from the iterable into a bounded queue
+        that the workers drain. Outcomes are yielded in the order tracks were
+        produced, and nothing is kept once it has been yielded: at most
+        queue_size + workers tracks are between the producer and the caller,
+        so memory doesn't grow with the number of tracks. When the workers or
+        the caller fall behind, the producer blocks, which holds back the
+        upstream export.
 
-                    result = self._get_best_result(results, track)
+        Args:
+            tracks: Iterable of tracks, e.g. a running export
+            func: Stage applied to every track
+            workers: Number of concurrent workers, defaults to the client setting
+            queue_size: Maximum number of tracks waiting for a worker
+            total: Expected number of tracks for the progress bar
+
+        Yields:
+            Tuple of (track, status, video_id) per track, in the order tracks were produced
+        """
+        workers = workers or self.workers
+        work: "queue.Queue[Optional[Tuple[int, Track]]]" = queue.Queue(maxsize=queue_size)
+        done: "queue.Queue[Optional[Tuple[int, Track, str, Optional[str], Optional[str]]]]" = queue.Queue()
+        # Tracks produced but not yielded yet, released by the caller side
+        window = threading.Semaphore(queue_size + workers)
+        failures: List[BaseException] = []
+        stop = threading.Event()
+
+        def produce() -> None:
+            try:
+                for i, track in enumerate(tracks):
+                    while not window.acquire(timeout=0.5):
+                        if stop.is_set():
+                            return
+                    if stop.is_set():
+                        return
+                    work.put((i, track))
+            except BaseException as e:
+                failures.append(e)
+            finally:
+                for _ in range(workers):
+                    work.put(None)
+
+        def consume() -> None:
+            ytmusic = self.ytmusic if workers == 1 else self._worker_ytmusic()
+            try:
+                while True:
+                    item = work.get()
+                    if item is None:
+                        return
+                    i, track = item
+                    if stop.is_set():
+                        continue
                     try:
-                        self.ytmusic.rate_song(result["videoId"], "LIKE")  # type: ignore
+                        status, video_id, message = func(ytmusic, track)
                     except Exception as e:
-                        errors.append(track)
-                        pbar.write(f"Error: {track.artist} - {track.name}, {e}")
+                        status, video_id, message = ERROR, None, f"Error: {track.artist} - {track.name}, {e}"
+                    done.put((i, track, status, video_id, message))
+            finally:
+                done.put(None)
+
+        threads = [threading.Thread(target=produce, daemon=True)]
+        threads += [threading.Thread(target=consume, daemon=True) for _ in range(workers)]
+        pbar = tqdm(total=total, position=0, desc=desc)
+        trank_log = tqdm(total=0, bar_format="{desc}", position=1)
+        # Outcomes that finished ahead of an earlier track, bounded by the window
+        ahead: Dict[int, Tuple[Track, str, Optional[str]]] = {}
+        next_index = 0
+        running = workers
+        try:
+            for thread in threads:
+                thread.start()
+            while running:
+                try:
+                    item = done.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if item is None:
+                    running -= 1
+                    continue
+                i, track, status, video_id, message = item
+                if message:
+                    pbar.write(message)
+                pbar.update(1)
+                trank_log.set_description_str(f"{track.artist} - {track.name}")
+                ahead[i] = (track, status, video_id)
+                while next_index in ahead:
+                    yield ahead.pop(next_index)
+                    next_index += 1
+                    window.release()
+        except BaseException:
+            # Interrupted or abandoned: let the workers drain the queue without
+            # processing it, outcomes so far are journaled
+            stop.set()
+            raise
+        finally:
+            trank_log.close()
+            pbar.close()
+
+        if failures:
+            raise failures[0]
+
+    def _stream_tracks(
+        self,
+        tracks: Iterable[Track],
+        func: Callable[[YTMusic, Track], Tuple[str, Optional[str], Optional[str]]],
+        workers: Optional[int] = None,
+        queue_size: int = 100,
+        total: Optional[int] = None,
+        desc: str = "Import tracks",
+    ) -> Tuple[List[Track], List[Tuple[str, Optional[str]]]]:
+        """
+        Collect the outcomes of _iter_stream_tracks().
+
+        Returns:
+            Tuple of (tracks in the order they were produced, (status, video_id) per track)
+        """
+        produced: List[Track] = []
+        results: List[Tuple[str, Optional[str]]] = []
+        for track, status, video_id in self._iter_stream_tracks(tracks, func, workers, queue_size, total, desc):
+            produced.append(track)
+            results.append((status, video_id))
+        return produced, results
+
+    def iter_liked_imports(
+        self,
+        tracks: Iterable[Track],
+        total: Optional[int] = None,
+        workers: Optional[int] = None,
+        queue_size: int = 100,
+        journal: Optional[TransferJournal] = None,
+    ) -> Iterator[Tuple[Track, str]]:
+        """
+        Search and like tracks while they are still being exported, yielding each outcome.
+
+        Nothing is retained between yields, so a transfer consuming the
+        outcomes as they come runs in constant memory.
+
+        Args:
+            tracks: Iterable of tracks, e.g. YaMusicHandle.iter_liked_tracks()
+            total: Expected number of tracks for the progress bar
+            workers: Number of concurrent search/like workers, defaults to the client setting
+            queue_size: Maximum number of exported tracks waiting for a worker
+            journal: Optional journal receiving every outcome as soon as it is known
 
-                    pbar.update(1)
-                    trank_log.set_description_str(f"{track.artist} - {track.name}")
+        Yields:
+            Tuple of (track, status) in the order tracks were produced,
+            status is "liked", "not_found" or "error"
+        """
+        try:
+            for track, status, _ in self._iter_stream_tracks(
+                tracks,
+                lambda ytmusic, track: self._import_track(ytmusic, track, journal),
+                workers,
+                queue_size,
+                total,
+                desc="Import tracks",
+            ):
+                yield track, status
+        finally:
+            self._invalidate_playlists("LM")
+
+    def stream_liked_tracks(
+        self,
+        tracks: Iterable[Track],
+        total: Optional[int] = None,
+        workers: Optional[int] = None,
+        queue_size: int = 100,
+        journal: Optional[TransferJournal] = None,
+    ) -> Tuple[List[Track], List[Track], List[Track]]:
+        """
+        Search and like tracks while they are still being exported.
+
+        Args:
+            tracks: Iterable of tracks, e.g. YaMusicHandle.iter_liked_tracks()
+            total: Expected number of tracks for the progress bar
+            workers: Number of concurrent search/like workers, defaults to the client setting
+            queue_size: Maximum number of exported tracks waiting for a worker
+            journal: Optional journal receiving every outcome as soon as it is known
+
+        Returns:
+            Tuple of (tracks, not_found, errors), all in the order tracks were produced
+        """
+        produced: List[Track] = []
+        not_found: List[Track] = []
+        errors: List[Track] = []
+        for track, status in self.iter_liked_imports(tracks, total, workers, queue_size, journal):
+            produced.append(track)
+            if status == NOT_FOUND:
+                not_found.append(track)
+            elif status == ERROR:
+                errors.append(track)
+
+        return produced, not_found, errors
+
+    def import_liked_tracks(
+        self,
+        tracks: List[Track],
+        workers: Optional[int] = None,
+        journal: Optional[TransferJournal] = None,
+    ) -> Tuple[List[Track], List[Track]]:
+        """
+        Search every track on YouTube Music and like the best match.
+
+        Args:
+            tracks: Tracks to import
+            workers: Number of concurrent workers, defaults to the client setting
+            journal: Optional journal receiving every outcome as soon as it is known
+
+        Returns:
+            Tuple of (not_found, errors), both in input order
+        """
+        results = self._run_tracks(
+            tracks,
+            lambda ytmusic, track: self._import_track(ytmusic, track, journal),
+            workers,
+            desc="Import tracks",
+        )
+        self._invalidate_playlists("LM")
+
+        not_found = [track for track, (status, _) in zip(tracks, results) if status == NOT_FOUND]
+        errors = [track for track, (status, _) in zip(tracks, results) if status == ERROR]
 
         return not_found, errors
 
-    def _get_best_result(self, results: List[dict], track: Track) -> dict:
-        songs = []
-        for result in results:
-            if "videoId" not in result.keys():
+    def match_tracks(
+        self,
+        tracks: List[Track],
+        workers: Optional[int] = None,
+        journal: Optional[TransferJournal] = None,
+    ) -> List[Tuple[str, Optional[str]]]:
+        """
+        Search every track on YouTube Music without liking it.
+
+        Returns:
+            List of (status, video_id) in input order, status is "matched", "not_found" or "error"
+        """
+        return self._run_tracks(
+            tracks,
+            lambda ytmusic, track: self._search_track(ytmusic, track, journal),
+            workers,
+            desc="Match tracks",
+        )
+
+    def import_tracks_to_playlist(
+        self,
+        tracks: List[Track],
+        playlist: str,
+        chunk_size: int = 100,
+        workers: Optional[int] = None,
+        journal: Optional[TransferJournal] = None,
+    ) -> Tuple[List[Track], List[Track]]:
+        """
+        Match tracks and write them to a playlist in large chunks instead of liking them.
+
+        Args:
+            tracks: Tracks to import
+            playlist: Target playlist id or title. A title that doesn't exist in the
+                library creates a new playlist seeded with the first chunk.
+            chunk_size: Number of videoIds per write call
+            workers: Number of concurrent search workers, defaults to the client setting
+            journal: Optional journal receiving every outcome as soon as it is known
+
+        Returns:
+            Tuple of (not_found, errors), both in input order
+        """
+        results = self.match_tracks(tracks, workers, journal)
+        return self._write_playlist_matches(tracks, results, playlist, chunk_size, journal)
+
+    def stream_tracks_to_playlist(
+        self,
+        tracks: Iterable[Track],
+        playlist: str,
+        total: Optional[int] = None,
+        chunk_size: int = 100,
+        workers: Optional[int] = None,
+        queue_size: int = 100,
+        journal: Optional[TransferJournal] = None,
+    ) -> Tuple[List[Track], List[Track], List[Track]]:
+        """
+        Match tracks while they are still being exported, then write them to a playlist in chunks.
+
+        Returns:
+            Tuple of (tracks, not_found, errors), all in the order tracks were produced
+        """
+        produced, results = self._stream_tracks(
+            tracks,
+            lambda ytmusic, track: self._search_track(ytmusic, track, journal),
+            workers,
+            queue_size,
+            total,
+            desc="Match tracks",
+        )
+        not_found, errors = self._write_playlist_matches(produced, results, playlist, chunk_size, journal)
+        return produced, not_found, errors
+
+    def _write_playlist_matches(
+        self,
+        tracks: List[Track],
+        results: List[Tuple[str, Optional[str]]],
+        playlist: str,
+        chunk_size: int = 100,
+        journal: Optional[TransferJournal] = None,
+    ) -> Tuple[List[Track], List[Track]]:
+        """
+        Write matched tracks to a playlist in chunks and journal the outcome.
+
+        Returns:
+            Tuple of (not_found, errors), both in input order
+        """
+        # Suppress duplicates within the import and against the current playlist contents
+        playlist_id = self.find_playlist_id(playlist)
+        existing = set()
+        if playlist_id:
+            existing = {track.video_id for track in self.get_playlist_tracks(playlist_id)}
+
+        video_ids = []
+        video_tracks: Dict[str, List[Track]] = {}
+        for track, (status, video_id) in zip(tracks, results):
+            if status != MATCHED:
                 continue
-            if result.get("category") == "Top result":
-                return result
-            if result.get("title") == track.name:
-                return result
-            songs.append(result)
-        if len(songs) == 0:
-            return results[0]
-        return songs[0]
+            if video_id not in video_tracks and video_id not in existing:
+                video_ids.append(video_id)
+            video_tracks.setdefault(video_id, []).append(track)
+
+        duplicates = sum(len(v) for v in video_tracks.values()) - len(video_ids)
+        print(f"Writing {len(video_ids)} tracks to playlist {playlist} ({duplicates} duplicates skipped)")
+
+        if playlist_id is None:
+            first_chunk, video_ids = video_ids[:chunk_size], video_ids[chunk_size:]
+            response = self.create_playlist(playlist, video_ids=first_chunk)
+            if not isinstance(response, str):
+                print(f"Error creating playlist {playlist}: {response}")
+                failed = set(first_chunk + video_ids)
+            else:
+                playlist_id = response
+                file_logger.info(f"Created playlist {playlist} ({playlist_id}) with {len(first_chunk)} tracks")
+                failed = set(self.add_playlist_items_chunked(playlist_id, video_ids, chunk_size)[1])
+        else:
+            failed = set(self.add_playlist_items_chunked(playlist_id, video_ids, chunk_size)[1])
+
+        not_found = []
+        errors = []
+        for track, (status, video_id) in zip(tracks, results):
+            if status == NOT_FOUND:
+                not_found.append(track)
+            elif status == ERROR or video_id in failed:
+                errors.append(track)
+                if status == MATCHED and journal is not None:
+                    journal.record(track, ERROR, video_id=video_id, error="add to playlist failed")
+            elif journal is not None:
+                journal.record(track, ADDED, video_id=video_id)
+
+        return not_found, errors
 
     # ===== Playlist Management Methods =====
 
-    def get_playlists(self, limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+    @contextmanager
+    def pinned_library(self):
+        """
+        Reuse library listings for the duration of the block.
+
+        Inside the block a listing is fetched once and served to every later
+        call until one of our own writes invalidates it, so scripted steps
+        share what the previous ones fetched.
+        """
+        self._listing_memo = {}
+        try:
+            yield self
+        finally:
+            self._listing_memo = None
+
+    def get_playlists(self, limit: Optional[int] = 100, refresh: bool = False) -> List[Dict[str, Any]]:
         """
         Retrieves the playlists in the user's library.
 
+        A listing in the library mirror is served as long as it is fresh, a
+        listing fetched inside pinned_library() as long as the block lasts.
+
         Args:
             limit: Number of playlists to retrieve. None retrieves them all.
+            refresh: Fetch the listing even if the mirror holds a fresh one
 
         Returns:
             List of owned playlists.
         """
+        key = str(limit)
+        memo = self._listing_memo
+        if memo is not None and not refresh and key in memo:
+            return memo[key]
+        if self.mirror is not None and not refresh:
+            entry = self.mirror.get("yt", "playlists", key)
+            if self.mirror.is_fresh(entry):
+                if memo is not None:
+                    memo[key] = entry.data  # type: ignore
+                return entry.data  # type: ignore
         try:
             playlists = self.ytmusic.get_library_playlists(limit=limit)
-            return playlists
         except Exception as e:
             print(f"Error getting library playlists: {e}")
             return []
+        if self.mirror is not None:
+            self.mirror.put("yt", "playlists", key, None, playlists)
+        if memo is not None:
+            memo[key] = playlists
+        return playlists
+
+    def _invalidate_playlists(self, *playlist_ids: str) -> None:
+        """Forget the library listing and the given playlists after a write"""
+        with self._memo_lock:
+            for playlist_id in playlist_ids:
+                self._playlist_memo.pop(playlist_id, None)
+        if self._listing_memo is not None:
+            self._listing_memo.clear()
+        if self.mirror is None:
+            return
+        self.mirror.invalidate("yt", "playlists")
+        for playlist_id in playlist_ids:
+            self.mirror.invalidate("yt", "playlist", playlist_id)
 
     def print_playlists(self, playlists: List[Dict[str, Any]]):
         for playlist in playlists:
@@ -155,15 +730,37 @@ class YTMusicClient:
                 video_ids=video_ids,
                 source_playlist=source_playlist,
             )
+            self._invalidate_playlists()
             return result
         except Exception as e:
             error_msg = f"Exception creating playlist: {type(e).__name__}: {e}"
             return {"status": "ERROR", "error": error_msg}
 
+    @staticmethod
+    def _compact_playlist(playlist: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Keep only the id, title, track count and tracks of a playlist, with
+        the tracks projected into TrackRecords.
+
+        Playlists stored in the library mirror before tracks were stored as
+        records hold song dicts, which are projected the same way.
+        """
+        if not playlist:
+            return {}
+        return {
+            "id": playlist.get("id"),
+            "title": playlist.get("title"),
+            "trackCount": playlist.get("trackCount"),
+            "tracks": [
+                TrackRecord.from_ytmusic(track) if isinstance(track, dict) else TrackRecord.from_row(track)
+                for track in playlist.get("tracks") or []
+            ],
+        }
+
     def get_playlist(self, playlist_id: str, limit: int = 5000) -> Dict[str, Any]:
-        """Get playlist details and tracks"""
+        """Get playlist details and tracks, projected by _compact_playlist()"""
         try:
-            return self.ytmusic.get_playlist(playlist_id, limit)
+            return self._compact_playlist(self.ytmusic.get_playlist(playlist_id, limit))
         except Exception as e:
             print(f"Error getting playlist {playlist_id}: {e}")
             return {}
@@ -171,8 +768,7 @@ class YTMusicClient:
     def get_playlist_artists(self, playlist: Dict[str, Any]) -> Set[str]:
         artists = set()
         for track in playlist["tracks"]:
-            for artist in track["artists"]:
-                artists.add(artist["name"])
+            artists.update(track.artists)
         return artists
 
     def add_playlist_items(
@@ -181,15 +777,58 @@ class YTMusicClient:
         """Add tracks to a playlist"""
         try:
             file_logger.info(f"Add {len(video_ids)} tracks to playlist {playlist_id}")
-            return self.ytmusic.add_playlist_items(playlist_id, video_ids)  # type: ignore
+            response = self.ytmusic.add_playlist_items(playlist_id, video_ids)  # type: ignore
+            self._invalidate_playlists(playlist_id)
+            return response
         except Exception as e:
             file_logger.error(f"Error adding items to playlist {playlist_id}: {e}")
             return {}
 
+    def add_playlist_items_chunked(
+        self, playlist_id: str, video_ids: List[str], chunk_size: int = 100
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Add tracks to a playlist with one call per chunk.
+
+        A chunk whose response is not successful is split in halves and retried,
+        so a single rejected videoId doesn't drop the rest of its chunk.
+
+        Returns:
+            Tuple of (added, failed) videoIds
+        """
+        added: List[str] = []
+        failed: List[str] = []
+        for i in range(0, len(video_ids), chunk_size):
+            self._add_playlist_chunk(playlist_id, video_ids[i:i + chunk_size], added, failed)
+        return added, failed
+
+    def _add_playlist_chunk(
+        self, playlist_id: str, chunk: List[str], added: List[str], failed: List[str]
+    ) -> None:
+        response = self.add_playlist_items(playlist_id, chunk)
+        if isinstance(response, dict) and "SUCCEEDED" in str(response.get("status", "")):
+            added.extend(chunk)
+        elif len(chunk) == 1:
+            file_logger.error(f"Failed to add {chunk[0]} to playlist {playlist_id}: {response}")
+            failed.extend(chunk)
+        else:
+            middle = len(chunk) // 2
+            self._add_playlist_chunk(playlist_id, chunk[:middle], added, failed)
+            self._add_playlist_chunk(playlist_id, chunk[middle:], added, failed)
+
+    def find_playlist_id(self, playlist: str) -> Optional[str]:
+        """Resolve a library playlist by id or title, None if there is no such playlist"""
+        for playlist_metadata in self.get_playlists(limit=None, refresh=True):
+            if playlist in (playlist_metadata.get("playlistId"), playlist_metadata.get("title")):
+                return playlist_metadata["playlistId"]
+        return None
+
     def delete_playlist(self, playlist_id: str) -> Dict[str, Any]:
         """Delete a playlist"""
         try:
-            return self.ytmusic.delete_playlist(playlist_id)  # type: ignore
+            response = self.ytmusic.delete_playlist(playlist_id)  # type: ignore
+            self._invalidate_playlists(playlist_id)
+            return response
         except Exception as e:
             error_msg = f"Error deleting playlist {playlist_id}: {e}"
             return {"status": "ERROR", "error": error_msg}
@@ -204,24 +843,26 @@ class YTMusicClient:
     ) -> Dict[str, Any]:
         """Edit playlist metadata"""
         try:
-            return self.ytmusic.edit_playlist(
+            response = self.ytmusic.edit_playlist(
                 playlist_id,
                 title,
                 description,
                 privacy_status,
                 move_item,  # type: ignore
             )
+            self._invalidate_playlists(playlist_id)
+            return response
         except Exception as e:
             error_msg = f"Error editing playlist {playlist_id}: {e}"
             return {"status": "ERROR", "error": error_msg}
 
-    def get_playlist_tracks(self, playlist_id: str) -> List[Dict[str, Any]]:
+    def get_playlist_tracks(self, playlist_id: str) -> List[TrackRecord]:
         """Get all tracks from a playlist"""
         playlist = self.get_playlist(playlist_id, limit=5000)  # Large limit to get all
         return playlist.get("tracks", [])
 
     def search_and_add_to_playlist(
-        self, playlist_id: str, tracks: List[Track], max_results: int = 5
+        self, playlist_id: str, tracks: List[Track], max_results: int = 5, chunk_size: int = 100
     ) -> Tuple[int, int, int]:
         """
         Search for tracks and add them to a playlist.
@@ -230,34 +871,21 @@ class YTMusicClient:
             playlist_id: Target playlist ID
             tracks: List of Track objects to search for
             max_results: Maximum number of search results to consider per track
+            chunk_size: Number of videoIds added per playlist write
 
         Returns:
             Tuple of (added_count, not_found_count, error_count)
         """
-        added = 0
+        video_ids = []
         not_found = 0
         errors = 0
 
         for track in tracks:
-            query = f"{track.artist} {track.name}"
-
             try:
-                results = self.ytmusic.search(query, filter="songs", limit=max_results)
+                video_id = self._match_track(self.ytmusic, track, limit=max_results)
 
-                if not results:
-                    not_found += 1
-                    continue
-
-                # Get the best result
-                best_result = None
-                for result in results:
-                    if "videoId" in result:
-                        best_result = result
-                        break
-
-                if best_result:
-                    self.add_playlist_items(playlist_id, [best_result["videoId"]])
-                    added += 1
+                if video_id:
+                    video_ids.append(video_id)
                 else:
                     not_found += 1
 
@@ -265,41 +893,126 @@ class YTMusicClient:
                 errors += 1
                 file_logger.error(f"Error processing {track.artist} - {track.name}: {e}")
 
-        return added, not_found, errors
+        added, failed = self.add_playlist_items_chunked(playlist_id, video_ids, chunk_size)
+        errors += len(failed)
+
+        return len(added), not_found, errors
+
+    def _fetch_playlist(self, playlist_id: str, limit: int = 5000) -> Dict[str, Any]:
+        """get_playlist on the calling worker thread's YTMusic instance"""
+        try:
+            return self._compact_playlist(self._worker_ytmusic().get_playlist(playlist_id, limit))
+        except Exception as e:
+            print(f"Error getting playlist {playlist_id}: {e}")
+            return {}
+
+    def fetch_playlists(
+        self,
+        playlists: List[Dict[str, Any]],
+        workers: Optional[int] = None,
+        limit: int = 5000,
+        refresh: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch full playlists concurrently.
+
+        Playlists fetched earlier in this session or stored in the library
+        mirror are reused as long as their track count in the library listing
+        hasn't changed. Playlists without a count (liked music) are reused from
+        the mirror while it is fresh.
+
+        Args:
+            playlists: Playlist metadata as returned by get_playlists()
+            workers: Number of concurrent requests, defaults to the client setting
+            limit: Maximum number of tracks per playlist
+            refresh: Refetch playlists without a count even if the mirror is fresh
+
+        Returns:
+            Full playlists in the order of `playlists` ({} for a failed fetch),
+            projected by _compact_playlist()
+        """
+        result: List[Dict[str, Any]] = [{}] * len(playlists)
+        to_fetch = []
+        with self._memo_lock:
+            for i, playlist_metadata in enumerate(playlists):
+                count = playlist_metadata.get("count")
+                memo = self._playlist_memo.get(playlist_metadata["playlistId"])
+                if count is not None and memo is not None and memo[0] == count:
+                    result[i] = memo[1]
+                    continue
+                if self.mirror is not None:
+                    entry = self.mirror.get("yt", "playlist", playlist_metadata["playlistId"])
+                    if entry is not None and (
+                        entry.version == str(count)
+                        if count is not None
+                        else not refresh and self.mirror.is_fresh(entry)
+                    ):
+                        result[i] = self._compact_playlist(entry.data)  # type: ignore
+                        continue
+                to_fetch.append(i)
+
+        if len(playlists) > len(to_fetch):
+            file_logger.info(f"Reusing {len(playlists) - len(to_fetch)} playlists fetched earlier")
+
+        with ThreadPoolExecutor(max_workers=workers or self.workers) as executor:
+            futures = {
+                executor.submit(self._fetch_playlist, playlists[i]["playlistId"], limit): i
+                for i in to_fetch
+            }
+            for future in tqdm(
+                as_completed(futures),
+                desc="Getting playlists",
+                total=len(futures),
+                unit="playlists",
+                bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]",
+            ):
+                i = futures[future]
+                playlist = future.result()
+                result[i] = playlist
+                count = playlists[i].get("count")
+                if playlist and count is not None:
+                    with self._memo_lock:
+                        self._playlist_memo[playlists[i]["playlistId"]] = (count, playlist)
+                if playlist and self.mirror is not None:
+                    self.mirror.put("yt", "playlist", playlists[i]["playlistId"], count, playlist)
+
+        return result
+
+    def refresh_mirror(self) -> None:
+        """
+        Bring the library mirror up to date.
+
+        The library listing is fetched again and only playlists whose track
+        count changed (plus liked music, which has no count) are refetched.
+        """
+        if self.mirror is None:
+            print("Library mirror is disabled")
+            return
+        playlists = [p for p in self.get_playlists(refresh=True) if p["playlistId"] != "SE"]
+        self.fetch_playlists(playlists, refresh=True)
+        print(f"Library mirror refreshed: {len(playlists)} playlists")
 
-    def get_track_out_playlist(self) -> List[Dict[str, Any]]:
+    def get_track_out_playlist(self) -> List[TrackRecord]:
         """Get tracks from liked music that are not in any mapped playlist"""
         skip_track_videoId = set()
         like_playlist = {}
-        playlists = self.get_playlists()
+        playlists = [p for p in self.get_playlists() if p["playlistId"] != "SE"]
 
-        for playlist_metadata in tqdm(
-            playlists,
-            desc="Getting playlists",
-            total=len(playlists),
-            unit="playlists",
-            bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]",
-        ):
-            if playlist_metadata["playlistId"] == "SE":
-                continue
+        for playlist in self.fetch_playlists(playlists):
+            if playlist.get("id") == "LM":
+                like_playlist = playlist
             else:
-                playlist = self.get_playlist(playlist_metadata["playlistId"])
-                if playlist["id"] == "LM":
-                    like_playlist = playlist
-                else:
-                    skip_track_videoId.update(
-                        [track["videoId"] for track in playlist["tracks"]]
-                    )
+                skip_track_videoId.update(track.video_id for track in playlist.get("tracks", []))
         track_out_playlist = []
 
         for track in tqdm(
-            like_playlist["tracks"],
+            like_playlist.get("tracks", []),
             desc="Choosing tracks out playlist",
-            total=len(like_playlist["tracks"]),
+            total=len(like_playlist.get("tracks", [])),
             unit="tracks",
             bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]",
         ):
-            if track["videoId"] not in skip_track_videoId:
+            if track.video_id not in skip_track_videoId:
                 track_out_playlist.append(track)
         
         file_logger.info(f"{len(track_out_playlist)} tracks out playlist")
@@ -307,7 +1020,7 @@ class YTMusicClient:
 
         return track_out_playlist
 
-    def print_tracks(self, tracks: List[Dict[str, Any]]):
+    def print_tracks(self, tracks: List[TrackRecord]):
         total_tracks = len(tracks)
         with open("tracks.txt", "w") as fw:
             for track in tqdm(
@@ -317,27 +1030,42 @@ class YTMusicClient:
                 unit="tracks",
                 bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]",
             ):
-                fw.write(
-                    f"{track['artists'][0]['name']}\t{track['title']}\t{track['videoId']}\n"
-                )
+                fw.write(f"{track.artist}\t{track.title}\t{track.video_id}\n")
 
         print(f"Successfully wrote {total_tracks} tracks to tracks.txt")
 
-    def distribute_tracks(self):
-        with open("playlists_map.yaml", "r", encoding="utf-8") as f:
+    def distribute_tracks(
+        self, any_artist: bool = False, chunk_size: int = 100, map_file: str = "playlists_map.yaml"
+    ):
+        """
+        Add liked tracks that are not in any playlist to the playlists of their artists.
+
+        The playlists map is compiled once into an artist -> playlists index and
+        the tracks are routed in a single pass, then added per playlist in chunks.
+
+        Args:
+            any_artist: Route by every credited artist instead of the main one only
+            chunk_size: Number of videoIds added per playlist write
+            map_file: Playlists map, as written by update_playlists_map()
+        """
+        with open(map_file, "r", encoding="utf-8") as f:
             playlists_map = yaml.safe_load(f)
 
+        index = ArtistIndex(playlists_map)
         track_out_playlist = self.get_track_out_playlist()
 
-        for playlist_info in playlists_map.values():
-            add_tracks = []
-            for track in track_out_playlist:
-                if track["artists"][0]["name"] in playlist_info["artists"]:
-                    add_tracks.append(track["videoId"])
-            
+        routes = index.route(
+            track_out_playlist,
+            lambda track: track.artists,
+            any_artist,
+        )
+
+        for name, playlist_info in playlists_map.items():
+            add_tracks = list(dict.fromkeys(track.video_id for track in routes.get(name, [])))
+
             file_logger.info(f"Add {len(add_tracks)} tracks to playlist {playlist_info['id']}")
             if (len(add_tracks)):
-                self.add_playlist_items(playlist_info["id"], add_tracks)
+                self.add_playlist_items_chunked(playlist_info["id"], add_tracks, chunk_size)
     
     def update_playlists_map(self, output_file: str = "playlists_map_updated.yaml"):
         """
@@ -362,9 +1090,11 @@ class YTMusicClient:
         
         playlists_map = {}
         
-        for playlist_metadata in tqdm(filtered_playlists, desc="Processing playlists"):
-            
-            playlist = self.get_playlist(playlist_metadata["playlistId"])
+        fetched = self.fetch_playlists(filtered_playlists)
+
+        for playlist_metadata, playlist in zip(filtered_playlists, fetched):
+            if not playlist:
+                continue
             artists = self.get_playlist_artists(playlist)
             key = playlist_metadata["title"].replace(":", " -")  # Avoid YAML key issues with colons
             
@@ -412,23 +1142,6 @@ class YTMusicClient:
         """
         Download a single track from YouTube using yt-dlp.
         """
-        import sys
-        from contextlib import contextmanager
-        
-        @contextmanager
-        def suppress_output():
-            """Context manager to suppress stdout and stderr"""
-            with open(os.devnull, 'w') as devnull:
-                old_stdout = sys.stdout
-                old_stderr = sys.stderr
-                sys.stdout = devnull
-                sys.stderr = devnull
-                try:
-                    yield
-                finally:
-                    sys.stdout = old_stdout
-                    sys.stderr = old_stderr
-        
         url = f"https://www.youtube.com/watch?v={video_id}"
         
         # Create output directory if it doesn't exist
@@ -452,9 +1165,9 @@ class YTMusicClient:
             
             'outtmpl': os.path.join(output_path, '%(artist)s - %(title)s.%(ext)s'),
             'concurrent_fragments': 6,
-            'progress': not quiet,  # Disable progress if quiet
             'quiet': quiet,
             'no_warnings': quiet,
+            'noprogress': quiet,
             'no_color': quiet,
             'ignoreerrors': True,
             'extract_flat': False,
@@ -473,37 +1186,314 @@ class YTMusicClient:
         if progress_hooks:
             ydl_opts['progress_hooks'] = progress_hooks
         
+        # yt-dlp is slow to import, load it only once something is downloaded
+        from yt_dlp import YoutubeDL
+
+        if quiet:
+            ydl_opts['logger'] = _QuietLogger()
+
         try:
-            # Use context manager to suppress ALL output if quiet
-            if quiet:
-                with suppress_output():
-                    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                        info = ydl.extract_info(url, download=True)
-                        filename = ydl.prepare_filename(info)
-                        filename = os.path.splitext(filename)[0] + f'.{format_type}'
-                        return filename
-            else:
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    info = ydl.extract_info(url, download=True)
-                    filename = ydl.prepare_filename(info)
-                    filename = os.path.splitext(filename)[0] + f'.{format_type}'
+            with YoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(url, download=True)
+                filename = ydl.prepare_filename(info)
+                filename = os.path.splitext(filename)[0] + f'.{format_type}'
+                if not quiet:
                     file_logger.info(f"Downloaded: {filename}")
-                    return filename
+                return filename
         except Exception as e:
             file_logger.error(f"Error downloading video {video_id}: {e}")
             return None
         
+    def _download_playlist_track(
+        self, video_id: str, output_path: str, format_type: str, quality: str
+    ) -> Optional[str]:
+        """
+        Download a playlist track, through the content store when one is configured.
+
+        With a store the track is fetched once into the store and linked into
+        the playlist folder under its usual "artist - title" file name.
+        """
+        def download(path: str) -> Optional[str]:
+            start = time.perf_counter()
+            filename = self.download_track(
+                video_id=video_id,
+                output_path=path,
+                format_type=format_type,
+                quality=quality,
+                progress_hooks=None,
+                quiet=True
+            )
+            self._record_download(time.perf_counter() - start, filename)
+            return filename
+
+        if self.store is None:
+            return download(output_path)
+
+        stored = self.store.fetch("yt", video_id, download, ext=format_type)
+        if stored is None:
+            return None
+        return self.store.link(stored, os.path.join(output_path, os.path.basename(stored)))
+
+    def _record_download(self, seconds: float, filename: Optional[str]) -> None:
+        """Account for a download in the metrics. download_track() logs the error itself and returns None."""
+        if self.metrics is None:
+            return
+        if filename and os.path.exists(filename):
+            self.metrics.observe("ytmusic", "download", seconds)
+            self.metrics.add_bytes("ytmusic", "download", os.path.getsize(filename))
+        else:
+            self.metrics.observe("ytmusic", "download", seconds, "DownloadError")
+
+    def _prepare_playlist_download(
+        self,
+        playlist_metadata: Dict[str, Any],
+        base_output_path: str,
+        skip_existing: bool,
+        track_db: TrackMapStore,
+        export_yaml: bool = False,
+        tracks: Optional[List[TrackRecord]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Fetch a playlist's tracks and load its track map before downloading.
+
+        Tracks already fetched by the caller are passed in as `tracks`.
+
+        A legacy track_map_<playlist>.yaml file is imported into the track
+        database the first time the playlist is seen.
+
+        Returns:
+            Download context of the playlist: stats, track map and the queue of
+            tracks still to process
+        """
+        playlist_id = playlist_metadata["playlistId"]
+        playlist_title = playlist_metadata["title"]
+
+        # Sanitize playlist name for folder name
+        safe_playlist_name = "".join(c for c in playlist_title if c not in '/\\:*?"<>|')
+        playlist_output_path = os.path.join(base_output_path, safe_playlist_name)
+
+        # Legacy/exported YAML track map of this playlist
+        track_map_file_path = Path(playlist_output_path) / f"track_map_{safe_playlist_name}.yaml"
+        track_map_file = str(track_map_file_path) if export_yaml else track_db.path
+
+        file_logger.info(f"\nProcessing playlist: {playlist_title} (ID: {playlist_id})")
+
+        # Get tracks in this playlist
+        if tracks is None:
+            tracks = self.get_playlist_tracks(playlist_id)
+
+        context = {
+            "id": playlist_id,
+            "title": playlist_title,
+            "path": playlist_output_path,
+            "track_map_file": track_map_file_path,
+            "track_db": track_db,
+            "export_yaml": export_yaml,
+            "track_map": {},
+            "existing_video_ids": set(),
+            "pending": deque(tracks),
+            "in_flight": set(),
+            "finished": False,
+        }
+
+        if not tracks:
+            file_logger.warning(f"  No tracks found in playlist: {playlist_title}")
+            context["stats"] = {
+                "total": 0,
+                "downloaded": 0,
+                "skipped": 0,
+                "failed": 0,
+                "path": playlist_output_path,
+                "track_map_file": track_map_file
+            }
+            context["finished"] = True
+            return context
+
+        file_logger.info(f"  Found {len(tracks)} tracks in playlist")
+
+        # Load existing track map for this playlist
+        if skip_existing:
+            try:
+                if os.path.exists(track_map_file_path):
+                    imported = track_db.import_yaml(playlist_id, str(track_map_file_path))
+                    if imported:
+                        file_logger.info(f"  Imported {imported} tracks from {track_map_file_path}")
+                context["track_map"] = track_db.load(playlist_id)
+
+                # Extract video IDs that have valid files
+                for video_id, track_info in context["track_map"].items():
+                    file_path = track_info.get("file_path")
+                    if file_path and os.path.exists(file_path):
+                        context["existing_video_ids"].add(video_id)
+                    else:
+                        # File missing, mark for re-download
+                        file_logger.warning(f"  Missing file for video ID {video_id}, will re-download")
+
+                existing = len(context["existing_video_ids"])
+                file_logger.info(f"  Loaded track map with {len(context['track_map'])} tracks, {existing} exist on disk")
+                if existing > 0:
+                    tqdm.write(f"  ✓ Loaded track map [{playlist_title}]: {existing} already downloaded tracks found")
+            except Exception as e:
+                tqdm.write(f"  Warning: Could not load track map: {e}")
+                context["track_map"] = {}
+
+        # Statistics for this playlist
+        context["stats"] = {
+            "total": len(tracks),
+            "downloaded": 0,
+            "skipped": 0,
+            "failed": 0,
+            "path": playlist_output_path,
+            "track_map_file": track_map_file,
+            "video_ids": {}  # Store mapping of video_id -> download status for this session
+        }
+
+        # Create output directory if it doesn't exist
+        Path(playlist_output_path).mkdir(parents=True, exist_ok=True)
+
+        return context
+
+    @staticmethod
+    def _track_names(track: TrackRecord) -> Tuple[str, str]:
+        return track.artist, track.title or "Unknown Title"
+
+    def _next_playlist_download(
+        self, context: Dict[str, Any], skip_existing: bool, pbar: tqdm
+    ) -> Optional[TrackRecord]:
+        """
+        Pop the next track of a playlist that needs downloading.
+
+        Tracks without a videoId and tracks already on disk are accounted for
+        right away. A track whose videoId is still being downloaded for this
+        playlist blocks the queue until that download finishes, so duplicates
+        are resolved exactly like in a serial run.
+        """
+        stats = context["stats"]
+        pending = context["pending"]
+        while pending:
+            track = pending[0]
+            video_id = track.video_id
+            if not video_id:
+                pending.popleft()
+                stats["failed"] += 1
+                file_logger.warning(f"  No video_id for track: {track.title or 'Unknown'}")
+                pbar.update(1)
+                continue
+
+            if video_id in context["in_flight"]:
+                return None
+
+            artist_name, title = self._track_names(track)
+
+            # Check if track already exists by video ID in this playlist's track map
+            if skip_existing and video_id in context["existing_video_ids"]:
+                pending.popleft()
+                stats["skipped"] += 1
+                stats["video_ids"][video_id] = {
+                    "status": "skipped", 
+                    "file": context["track_map"].get(video_id, {}).get("file_path", "unknown"),
+                    "title": title,
+                    "artist": artist_name
+                }
+                file_logger.info(f"  ✓ Skipped (exists by video ID): {artist_name} - {title} (ID: {video_id})")
+                pbar.update(1)
+                continue
+
+            pending.popleft()
+            return track
+        return None
+
+    def _record_playlist_download(
+        self, context: Dict[str, Any], track: TrackRecord, downloaded_file: Optional[str]
+    ) -> None:
+        """Account for a finished download in the playlist stats and track map"""
+        stats = context["stats"]
+        video_id = track.video_id
+        artist_name, title = self._track_names(track)
+
+        if downloaded_file and os.path.exists(downloaded_file):
+            stats["downloaded"] += 1
+
+            # Store in track map
+            context["track_map"][video_id] = {
+                "video_id": video_id,
+                "title": title,
+                "artist": artist_name,
+                "file_path": downloaded_file,
+                "filename": os.path.basename(downloaded_file),
+                "playlist": context["title"],
+                "playlist_id": context["id"],
+                "downloaded_at": datetime.now().isoformat()
+            }
+            try:
+                context["track_db"].put(context["id"], context["track_map"][video_id])
+            except Exception as e:
+                file_logger.error(f"Error saving track map: {e}")
+
+            stats["video_ids"][video_id] = {
+                "status": "downloaded", 
+                "file": downloaded_file,
+                "title": title,
+                "artist": artist_name
+            }
+
+            # Add to existing_video_ids for this playlist
+            context["existing_video_ids"].add(video_id)
+
+            file_logger.info(f"  ✓ Downloaded: {artist_name} - {title} -> {os.path.basename(downloaded_file)}")
+        else:
+            stats["failed"] += 1
+            stats["video_ids"][video_id] = {
+                "status": "failed", 
+                "error": "download failed",
+                "title": title,
+                "artist": artist_name
+            }
+            file_logger.error(f"  ✗ Failed: {artist_name} - {title} (ID: {video_id})")
+
+    def _finish_playlist_download(self, context: Dict[str, Any], playlist_pbar: tqdm) -> None:
+        """Optional YAML export of the track map and summary of a completed playlist"""
+        context["finished"] = True
+        stats = context["stats"]
+
+        if context["export_yaml"]:
+            try:
+                exported = context["track_db"].export_yaml(context["id"], str(context["track_map_file"]))
+                tqdm.write(f"  ✓ Track map exported to: {context['track_map_file']}")
+                file_logger.info(f"Track map exported with {exported} tracks")
+            except Exception as e:
+                file_logger.error(f"Error exporting track map: {e}")
+
+        # Log playlist summary to file
+        file_logger.info(f"  Playlist '{context['title']}': {stats['downloaded']} downloaded, "
+                    f"{stats['skipped']} skipped, {stats['failed']} failed")
+
+        # Print a clean line for this playlist summary
+        tqdm.write(f"\n✓ Playlist '{context['title']}': {stats['downloaded']} downloaded, "
+            f"{stats['skipped']} skipped, {stats['failed']} failed")
+
+        playlist_pbar.update(1)
+
     def download_all_playlists(
         self,
         base_output_path: str = "downloads",
         format_type: str = "mp3",
         quality: str = "best",
         skip_existing: bool = True,
-        playlist_limit: Optional[int] = 100
+        playlist_limit: Optional[int] = 100,
+        workers: int = 4,
+        per_playlist_workers: Optional[int] = None,
+        export_yaml: bool = False,
     ) -> Dict[str, Dict[str, Any]]:
         """
         Download all tracks from all user playlists, organizing by playlist.
         Checks track existence using video IDs and stores a map for each playlist.
+
+        Downloads run in a pool of `workers` threads. Stats and track maps are
+        only updated from the calling thread as downloads complete. With a
+        content store each videoId is downloaded once across all playlists.
+        Download state is kept in <base_output_path>/track_maps.sqlite and each
+        finished track is committed right away.
         
         Args:
             base_output_path: Base directory for downloads (creates playlist subfolders)
@@ -511,6 +1501,9 @@ class YTMusicClient:
             quality: Audio quality (best, high, medium, low)
             skip_existing: If True, skip already downloaded tracks using video ID tracking
             playlist_limit: Maximum number of playlists to fetch
+            workers: Maximum number of concurrent downloads overall
+            per_playlist_workers: Optional maximum number of concurrent downloads per playlist
+            export_yaml: Also write the legacy track_map_<playlist>.yaml files when a playlist completes
                 
         Returns:
             Dictionary with playlist names as keys and download statistics as values
@@ -532,219 +1525,92 @@ class YTMusicClient:
         
         # Statistics for each playlist
         download_stats = {}
-        
-        # Create a main progress bar for playlists
-        playlist_pbar = tqdm(
-            total=len(playlists), 
-            desc="Overall progress", 
-            unit="playlist",
-            position=0,
-            bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]"
-        )
-        
-        # Process each playlist
-        for playlist_idx, playlist_metadata in enumerate(playlists, 1):
-            playlist_id = playlist_metadata["playlistId"]
-            playlist_title = playlist_metadata["title"]
-            
-            # Update playlist progress bar description
-            playlist_pbar.set_description(f"Playlist {playlist_idx}/{len(playlists)}: {playlist_title[:50]}")
-            
-            # Sanitize playlist name for folder name
-            safe_playlist_name = "".join(c for c in playlist_title if c not in '/\\:*?"<>|')
-            playlist_output_path = os.path.join(base_output_path, safe_playlist_name)
-            
-            # Create playlist-specific track map file path
-            track_map_file_path = Path(playlist_output_path) / f"track_map_{safe_playlist_name}.yaml"
-            
-            file_logger.info(f"\nProcessing playlist: {playlist_title} (ID: {playlist_id})")
-            
-            # Get tracks in this playlist
-            tracks = self.get_playlist_tracks(playlist_id)
-            
-            if not tracks:
-                file_logger.warning(f"  No tracks found in playlist: {playlist_title}")
-                download_stats[playlist_title] = {
-                    "total": 0,
-                    "downloaded": 0,
-                    "skipped": 0,
-                    "failed": 0,
-                    "path": playlist_output_path,
-                    "track_map_file": str(track_map_file_path)
-                }
-                playlist_pbar.update(1)
-                continue
-            
-            file_logger.info(f"  Found {len(tracks)} tracks in playlist")
-            
-            # Load existing track map for this playlist if it exists
-            track_map = {}
-            existing_video_ids = set()
-            
-            if skip_existing and os.path.exists(track_map_file_path):
-                try:
-                    with open(track_map_file_path, 'r', encoding='utf-8') as f:
-                        track_map = yaml.safe_load(f) or {}
-                    
-                    # Extract video IDs that have valid files
-                    for video_id, track_info in track_map.items():
-                        file_path = track_info.get("file_path")
-                        if file_path and os.path.exists(file_path):
-                            existing_video_ids.add(video_id)
-                        else:
-                            # File missing, mark for re-download
-                            file_logger.warning(f"  Missing file for video ID {video_id}, will re-download")
-                            existing_video_ids.discard(video_id)
-                    
-                    file_logger.info(f"  Loaded track map with {len(track_map)} tracks, {len(existing_video_ids)} exist on disk")
-                    if len(existing_video_ids) > 0:
-                        print(f"  ✓ Loaded track map: {len(existing_video_ids)} already downloaded tracks found")
-                except Exception as e:
-                    print(f"  Warning: Could not load track map: {e}")
-                    track_map = {}
-            
-            # Statistics for this playlist
-            stats = {
-                "total": len(tracks),
-                "downloaded": 0,
-                "skipped": 0,
-                "failed": 0,
-                "path": playlist_output_path,
-                "track_map_file": str(track_map_file_path),
-                "video_ids": {}  # Store mapping of video_id -> download status for this session
-            }
-            
-            # Create output directory if it doesn't exist
-            Path(playlist_output_path).mkdir(parents=True, exist_ok=True)
-            
-            # Create a sub-progress bar for tracks in this playlist
+        contexts = []
+
+        Path(base_output_path).mkdir(parents=True, exist_ok=True)
+        track_db = TrackMapStore(os.path.join(base_output_path, "track_maps.sqlite"))
+        try:
+            # Concurrent fetch that reuses playlists fetched earlier in the session
+            fetched = self.fetch_playlists(playlists)
+
+            for playlist_metadata, playlist in zip(playlists, fetched):
+                context = self._prepare_playlist_download(
+                    playlist_metadata,
+                    base_output_path,
+                    skip_existing,
+                    track_db,
+                    export_yaml,
+                    tracks=playlist.get("tracks", []),
+                )
+                download_stats[context["title"]] = context["stats"]
+                contexts.append(context)
+
+            # Progress bars for the pool as a whole
+            playlist_pbar = tqdm(
+                total=len(contexts), 
+                desc="Playlists", 
+                unit="playlist",
+                position=0,
+                bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]"
+            )
             track_pbar = tqdm(
-                total=len(tracks), 
-                desc=f"  [{playlist_title[:40]}] Downloading tracks", 
+                total=sum(context["stats"]["total"] for context in contexts), 
+                desc="Tracks", 
                 unit="track", 
                 position=1,
-                leave=False,
                 bar_format="{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]"
             )
-            
-            for track in tracks:
-                # Get track info
-                video_id = track.get("videoId")
-                if not video_id:
-                    stats["failed"] += 1
-                    file_logger.warning(f"  No video_id for track: {track.get('title', 'Unknown')}")
-                    track_pbar.update(1)
-                    continue
-                
-                # Get artist and title for logging
-                artists = track.get("artists", [])
-                artist_name = artists[0].get("name", "Unknown Artist") if artists else "Unknown Artist"
-                title = track.get("title", "Unknown Title")
-                
-                # Update track progress bar with current track info
-                track_pbar.set_description(f"  [{playlist_title[:30]}] {artist_name[:20]} - {title[:30]}")
-                
-                # Check if track already exists by video ID in this playlist's track map
-                if skip_existing and video_id in existing_video_ids:
-                    stats["skipped"] += 1
-                    stats["video_ids"][video_id] = {
-                        "status": "skipped", 
-                        "file": track_map.get(video_id, {}).get("file_path", "unknown"),
-                        "title": title,
-                        "artist": artist_name
-                    }
-                    file_logger.info(f"  ✓ Skipped (exists by video ID): {artist_name} - {title} (ID: {video_id})")
-                    track_pbar.update(1)
-                    continue
-                
-                # Log to file before downloading
-                file_logger.info(f"  ↓ Downloading: {artist_name} - {title} (ID: {video_id})")
-                
-                # Download the track
-                downloaded_file = self.download_track(
-                    video_id=video_id,
-                    output_path=playlist_output_path,
-                    format_type=format_type,
-                    quality=quality,
-                    progress_hooks=None,
-                    quiet=True
-                )
-                
-                if downloaded_file and os.path.exists(downloaded_file):
-                    stats["downloaded"] += 1
-                    
-                    # Store in track map
-                    track_map[video_id] = {
-                        "video_id": video_id,
-                        "title": title,
-                        "artist": artist_name,
-                        "file_path": downloaded_file,
-                        "filename": os.path.basename(downloaded_file),
-                        "playlist": playlist_title,
-                        "playlist_id": playlist_id,
-                        "downloaded_at": datetime.now().isoformat()
-                    }
-                    
-                    stats["video_ids"][video_id] = {
-                        "status": "downloaded", 
-                        "file": downloaded_file,
-                        "title": title,
-                        "artist": artist_name
-                    }
-                    
-                    # Add to existing_video_ids for this playlist
-                    existing_video_ids.add(video_id)
-                    
-                    file_logger.info(f"  ✓ Downloaded: {artist_name} - {title} -> {os.path.basename(downloaded_file)}")
-                else:
-                    stats["failed"] += 1
-                    stats["video_ids"][video_id] = {
-                        "status": "failed", 
-                        "error": "download failed",
-                        "title": title,
-                        "artist": artist_name
-                    }
-                    file_logger.error(f"  ✗ Failed: {artist_name} - {title} (ID: {video_id})")
-                
-                # Save track map periodically (every 5 tracks or after each download)
-                if len(stats["video_ids"]) % 5 == 0:
-                    try:
-                        with open(track_map_file_path, 'w', encoding='utf-8') as f:
-                            yaml.dump(track_map, f, allow_unicode=True, default_flow_style=False)
-                    except Exception as e:
-                        file_logger.error(f"Error saving track map: {e}")
-                
-                track_pbar.update(1)
-            
-            # Close track progress bar
+
+            futures = {}
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                while True:
+                    # Fill free worker slots, respecting the per-playlist limit
+                    for context in contexts:
+                        if context["finished"]:
+                            continue
+                        while len(futures) < workers and (
+                            per_playlist_workers is None or len(context["in_flight"]) < per_playlist_workers
+                        ):
+                            track = self._next_playlist_download(context, skip_existing, track_pbar)
+                            if track is None:
+                                break
+                            artist_name, title = self._track_names(track)
+                            file_logger.info(f"  ↓ Downloading: {artist_name} - {title} (ID: {track.video_id})")
+                            future = executor.submit(
+                                self._download_playlist_track,
+                                track.video_id,
+                                context["path"],
+                                format_type,
+                                quality,
+                            )
+                            futures[future] = (context, track)
+                            context["in_flight"].add(track.video_id)
+
+                        if not context["pending"] and not context["in_flight"]:
+                            self._finish_playlist_download(context, playlist_pbar)
+
+                    if not futures:
+                        break
+
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        context, track = futures.pop(future)
+                        context["in_flight"].discard(track.video_id)
+                        self._record_playlist_download(context, track, future.result())
+                        track_pbar.update(1)
+
+                    downloaded = sum(c["stats"]["downloaded"] for c in contexts)
+                    skipped = sum(c["stats"]["skipped"] for c in contexts)
+                    failed = sum(c["stats"]["failed"] for c in contexts)
+                    track_pbar.set_postfix_str(f"✓ {downloaded}↓ {skipped}⏭ {failed}✗")
+
+            # Empty playlists are finished on preparation, account for them in the bar
+            playlist_pbar.update(len(contexts) - playlist_pbar.n)
             track_pbar.close()
-            
-            # Final save of track map for this playlist
-            try:
-                with open(track_map_file_path, 'w', encoding='utf-8') as f:
-                    yaml.dump(track_map, f, allow_unicode=True, default_flow_style=False)
-                print(f"  ✓ Track map saved to: {track_map_file_path}")
-                file_logger.info(f"Track map saved with {len(track_map)} tracks")
-            except Exception as e:
-                file_logger.error(f"Error saving final track map: {e}")
-            
-            download_stats[playlist_title] = stats
-            
-            # Update playlist progress bar with summary
-            playlist_pbar.set_postfix_str(f"✓ {stats['downloaded']}↓ {stats['skipped']}⏭ {stats['failed']}✗")
-            
-            # Log playlist summary to file
-            file_logger.info(f"  Playlist '{playlist_title}': {stats['downloaded']} downloaded, "
-                        f"{stats['skipped']} skipped, {stats['failed']} failed")
-            
-            # Print a clean line for this playlist summary
-            print(f"\n✓ Playlist '{playlist_title}': {stats['downloaded']} downloaded, "
-                f"{stats['skipped']} skipped, {stats['failed']} failed")
-            
-            playlist_pbar.update(1)
-        
-        # Close main progress bar
-        playlist_pbar.close()
+            playlist_pbar.close()
+        finally:
+            # Every finished track is committed already, this releases the database
+            track_db.close()
         
         # Print and log overall summary
         print("\n" + "="*50)
@@ -0,0 +1,122 @@
+import json
+import unittest
+from types import SimpleNamespace
+from typing import List, Tuple
+
+from src.yamusic import YaMusicHandle
+
+
+def desired(*ids: str) -> List[dict]:
+    return [{'id': track_id, 'album_id': f'a{track_id}'} for track_id in ids]
+
+
+def apply_deletes(current: List[str], ranges: List[Tuple[int, int]]) -> List[str]:
+    tracks = list(current)
+    for start, end in ranges:
+        del tracks[start:end]
+    return tracks
+
+
+class FakePlaylistClient:
+    """Applies users_playlists_change operations in order, as the Yandex API does"""
+
+    def __init__(self, ids: List[str]):
+        self.ids = list(ids)
+        self.revision = 1
+        self.changes = []
+
+    def users_playlists(self, kind):
+        tracks = [SimpleNamespace(id=track_id) for track_id in self.ids]
+        return SimpleNamespace(tracks=tracks, track_count=len(tracks), revision=self.revision)
+
+    def users_playlists_change(self, kind, diff, revision):
+        assert revision == self.revision, "stale revision"
+        operations = json.loads(diff)
+        self.changes.append(operations)
+        for operation in operations:
+            if operation['op'] == 'delete':
+                assert 0 <= operation['from'] < operation['to'] <= len(self.ids)
+                del self.ids[operation['from']:operation['to']]
+            else:
+                assert operation['at'] == len(self.ids), "insert must append"
+                self.ids[operation['at']:operation['at']] = [track['id'] for track in operation['tracks']]
+        self.revision += 1
+        return SimpleNamespace(revision=self.revision)
+
+
+def sync(current: List[str], tracks: List[dict], batch_size: int = 50) -> Tuple[FakePlaylistClient, Tuple[int, int]]:
+    handle = YaMusicHandle.__new__(YaMusicHandle)
+    handle._client = FakePlaylistClient(current)
+    return handle._client, handle.sync_playlist_tracks(3, tracks, batch_size)
+
+
+class PlaylistDiffTest(unittest.TestCase):
+    def test_no_change(self):
+        self.assertEqual(YaMusicHandle._playlist_diff(['1', '2', '3'], desired('1', '2', '3')), ([], []))
+        # Order of the desired tracks doesn't matter, present tracks keep their position
+        self.assertEqual(YaMusicHandle._playlist_diff(['3', '1', '2'], desired('1', '2', '3')), ([], []))
+
+    def test_only_deletes(self):
+        current = ['1', '2', '3', '4', '5']
+        ranges, inserts = YaMusicHandle._playlist_diff(current, desired('2', '4'))
+        self.assertEqual(ranges, [(4, 5), (2, 3), (0, 1)])
+        self.assertEqual(inserts, [])
+        self.assertEqual(apply_deletes(current, ranges), ['2', '4'])
+
+    def test_delete_everything(self):
+        ranges, inserts = YaMusicHandle._playlist_diff(['1', '2', '3'], [])
+        self.assertEqual(ranges, [(0, 3)])
+        self.assertEqual(inserts, [])
+
+    def test_duplicate_ids(self):
+        current = ['1', '1', '2', '1', '2']
+        ranges, inserts = YaMusicHandle._playlist_diff(current, desired('1', '2'))
+        self.assertEqual(ranges, [(3, 5), (1, 2)])
+        self.assertEqual(inserts, [])
+        self.assertEqual(apply_deletes(current, ranges), ['1', '2'])
+
+        # A desired track listed twice is appended once
+        ranges, inserts = YaMusicHandle._playlist_diff([], desired('1', '1'))
+        self.assertEqual([track['id'] for track in inserts], ['1'])
+
+    def test_interleaved_keep_and_delete(self):
+        current = ['1', '2', '3', '4', '5', '6', '7']
+        ranges, inserts = YaMusicHandle._playlist_diff(current, desired('7', '1', '3', '4'))
+        self.assertEqual(ranges, [(4, 6), (1, 2)])
+        self.assertEqual(inserts, [])
+        self.assertEqual(apply_deletes(current, ranges), ['1', '3', '4', '7'])
+
+    def test_appends_after_deletes(self):
+        current = ['1', '2', '3', '4']
+        ranges, inserts = YaMusicHandle._playlist_diff(current, desired('3', '5', '1', '6'))
+        self.assertEqual(ranges, [(3, 4), (1, 2)])
+        self.assertEqual([track['id'] for track in inserts], ['5', '6'])
+
+    def test_sync_applies_the_diff(self):
+        client, counts = sync(['1', '2', '3', '4'], desired('3', '5', '1', '6'))
+        self.assertEqual(counts, (2, 2))
+        self.assertEqual(client.ids, ['1', '3', '5', '6'])
+        self.assertEqual(len(client.changes), 1)
+
+    def test_sync_inserts_in_batches_after_deletes(self):
+        client, counts = sync(['1', '2', '1', '3', '9'], desired('1', '3', '4', '5', '6'), batch_size=2)
+        self.assertEqual(counts, (3, 3))
+        self.assertEqual(client.ids, ['1', '3', '4', '5', '6'])
+        # Deletes go with the first batch, every later batch appends at the new end
+        self.assertEqual(len(client.changes), 2)
+        self.assertEqual([op['op'] for op in client.changes[0]], ['delete', 'delete', 'insert'])
+
+    def test_sync_empty_playlist(self):
+        client, counts = sync([], desired('1', '2'))
+        self.assertEqual(counts, (0, 2))
+        self.assertEqual(client.ids, ['1', '2'])
+
+    def test_sync_up_to_date_playlist_writes_nothing(self):
+        client, counts = sync(['2', '1'], desired('1', '2'))
+        self.assertEqual(counts, (0, 0))
+        self.assertEqual(client.ids, ['2', '1'])
+        self.assertEqual(client.changes, [])
+
+
+if __name__ == '__main__':
+    unittest.main()